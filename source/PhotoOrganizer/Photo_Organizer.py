@@ -1,38 +1,103 @@
 import os
-import shutil
+import errno
+import re
+import stat
 import time
-import hashlib
-import socket
+import struct
 import getpass
 import sys
-import subprocess
 import signal
 import atexit
-import json
+import collections
+import functools
+import importlib
+import importlib.util
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from PIL import Image
-from PIL.ExifTags import TAGS
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import FileSystemEventHandler, FileCreatedEvent
+# Modules only needed on some code paths (hashlib, json, socket, subprocess, argparse,
+# watchdog.observers, watchfiles) are imported where they are used to keep startup fast
 
-# File locking support (Unix/Linux only)
+# Pillow is imported on first use (see load_pillow) so video-only workloads never load it
+Image = None
+
+def load_pillow():
+    """Import Pillow on first use and return the PIL.Image module."""
+    global Image
+    if Image is None:
+        from PIL import Image as pil_image
+        Image = pil_image
+    return Image
+
+# Optional dependency: mutagen for video metadata extraction (imported on first use, see load_mutagen)
+# Note: QuickTime module doesn't exist in mutagen 1.47.0+
+# MOV files are handled by MP4 module since they share the same container format
+MUTAGEN_AVAILABLE = importlib.util.find_spec('mutagen') is not None
+MP4 = None
+
+def load_mutagen():
+    """Import mutagen's MP4 reader on first use; returns False if mutagen is unusable."""
+    global MP4, MUTAGEN_AVAILABLE
+    if MP4 is None and MUTAGEN_AVAILABLE:
+        try:
+            from mutagen.mp4 import MP4 as mp4_class
+            MP4 = mp4_class
+        except ImportError:
+            MUTAGEN_AVAILABLE = False
+    return MUTAGEN_AVAILABLE
+
+# Optional dependency: xxhash for fast (non-cryptographic) duplicate detection hashing
 try:
-    import fcntl
-    HAS_FCNTL = True
+    import xxhash
+    XXHASH_AVAILABLE = True
 except ImportError:
-    HAS_FCNTL = False
+    xxhash = None
+    XXHASH_AVAILABLE = False
 
-# Optional dependency: mutagen for video metadata extraction
+# Optional dependency: blake3 for fast, multithreaded duplicate detection hashing
 try:
-    import mutagen
-    from mutagen.mp4 import MP4
-    # Note: QuickTime module doesn't exist in mutagen 1.47.0+
-    # MOV files are handled by MP4 module since they share the same container format
-    MUTAGEN_AVAILABLE = True
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
 except ImportError:
-    mutagen = None
-    MP4 = None
-    MUTAGEN_AVAILABLE = False
+    blake3 = None
+    BLAKE3_AVAILABLE = False
+
+# Optional dependency: orjson for fast statistics file encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+def _json_dumps_bytes(obj):
+    """Encode obj as UTF-8 JSON indented by 2 spaces, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    import json
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+def _json_loads(data):
+    """Decode JSON from bytes or str, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    import json
+    return json.loads(data)
+
+# Optional dependency: inotify_simple for native inotify watching on Linux (Synology)
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except (ImportError, OSError, AttributeError):
+    INotify = None
+    inotify_flags = None
+    INOTIFY_AVAILABLE = False
+
+# Optional dependency: watchfiles for native (Rust) folder watching with debouncing
+# (imported by WatchfilesObserver when it starts)
+WATCHFILES_AVAILABLE = importlib.util.find_spec('watchfiles') is not None
 
 def get_package_version():
     """Get package version from VERSION file."""
@@ -50,8 +115,9 @@ def get_package_version():
 
 PACKAGE_VERSION = get_package_version()
 
+@functools.lru_cache(maxsize=1)
 def is_synology_nas():
-    """Check if the script is running on a Synology NAS."""
+    """Check if the script is running on a Synology NAS (cached, the result cannot change)."""
     # Check for Synology-specific paths
     if os.path.exists('/etc/synoinfo.conf'):
         return True
@@ -69,8 +135,6 @@ def is_synology_nas():
         return True
     return False
 
-import configparser
-
 # Source and destination directories
 # Use Synology path if running on NAS, otherwise use Windows path.
 # Defaults can be overridden by a runtime config file written by postinst.
@@ -85,10 +149,51 @@ else:
 SOURCE_DIR = DEFAULT_SOURCE_DIR
 DEST_DIR = DEFAULT_DEST_DIR
 DELETE_DUPLICATES = True
+# Pre-filter duplicate candidates with a head/tail fingerprint before hashing whole files
+FAST_DEDUP = True
+# Spread the Duplicates folder over subfolders named after the first hash characters
+SHARD_DUPLICATES = False
+# Process new files when the writer closes them (inotify IN_CLOSE_WRITE) where supported
+USE_CLOSE_EVENTS = True
+# Seconds between folder scans when SOURCE_DIR is on a network share (polling observer)
+POLL_INTERVAL = 30.0
+# Worker threads for file processing ([processing] jobs or --jobs); None for the default
+CONFIGURED_JOBS = None
+
+# key=value or key: value option line; like configparser, the first '=' or ':' separates them
+_CONFIG_OPTION_RE = re.compile(r'([^=:]+?)\s*[=:]\s*(.*)')
+
+def read_config_file(path):
+    """Read a simple INI file ([section] headers and key=value or key: value lines).
+    
+    Covers the config.ini written by postinst without importing configparser.
+    Keys are lower-cased like configparser does; lines starting with # or ; are comments.
+    Invalid lines are skipped with a warning, so one bad line does not discard the file.
+    
+    Returns:
+        Dict mapping section name to a dict of key/value strings
+    """
+    config = {}
+    section = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line[0] in '#;':
+                continue
+            if line[0] == '[' and line[-1] == ']':
+                section = config.setdefault(line[1:-1].strip(), {})
+                continue
+            match = _CONFIG_OPTION_RE.match(line)
+            if section is None or not match:
+                print(f"Warning: Ignoring invalid line {line_number} in config file {path}: {line}")
+                continue
+            section[match.group(1).lower()] = match.group(2)
+    return config
 
 def load_runtime_config():
-    """Load runtime configuration (paths, duplicate policy) if available."""
-    global SOURCE_DIR, DEST_DIR, DELETE_DUPLICATES
+    """Load runtime configuration (paths, duplicate policy, watcher options) if available."""
+    global SOURCE_DIR, DEST_DIR, DELETE_DUPLICATES, FAST_DEDUP, SHARD_DUPLICATES, USE_CLOSE_EVENTS, POLL_INTERVAL
+    global CONFIGURED_JOBS
 
     config_paths = []
     if is_synology_nas():
@@ -102,30 +207,56 @@ def load_runtime_config():
         # For local testing on Windows/Linux, allow a config.ini next to the script
         config_paths = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.ini")]
 
-    parser = configparser.ConfigParser()
-
     for path in config_paths:
-        if not os.path.exists(path):
-            continue
         try:
-            parser.read(path, encoding="utf-8")
-
-            if parser.has_section("paths"):
-                source_dir = parser.get("paths", "source_dir", fallback=SOURCE_DIR)
-                dest_root = parser.get("paths", "destination_root", fallback=DEST_DIR)
-
-                if source_dir:
-                    SOURCE_DIR = source_dir
-                if dest_root:
-                    DEST_DIR = dest_root
-
-            if parser.has_section("duplicates"):
-                delete_str = parser.get("duplicates", "delete", fallback="true").strip().lower()
-                DELETE_DUPLICATES = delete_str in ("1", "true", "yes", "y")
-
-            break  # Successfully loaded a config, no need to try other paths
+            config = read_config_file(path)
+        except FileNotFoundError:
+            continue
         except Exception as e:
             print(f"Warning: Error reading config file {path}: {e}")
+            continue
+        
+        if "paths" in config:
+            source_dir = config["paths"].get("source_dir", SOURCE_DIR)
+            dest_root = config["paths"].get("destination_root", DEST_DIR)
+
+            if source_dir:
+                SOURCE_DIR = source_dir
+            if dest_root:
+                DEST_DIR = dest_root
+        
+        if "duplicates" in config:
+            delete_str = config["duplicates"].get("delete", "true").lower()
+            DELETE_DUPLICATES = delete_str in ("1", "true", "yes", "y")
+            fast_dedup_str = config["duplicates"].get("fast_dedup", "true").lower()
+            FAST_DEDUP = fast_dedup_str in ("1", "true", "yes", "y")
+            shard_str = config["duplicates"].get("shard", "false").lower()
+            SHARD_DUPLICATES = shard_str in ("1", "true", "yes", "y")
+        
+        if "watcher" in config:
+            close_events_str = config["watcher"].get("close_events", "true").lower()
+            USE_CLOSE_EVENTS = close_events_str in ("1", "true", "yes", "y")
+            poll_interval_str = config["watcher"].get("poll_interval", "")
+            if poll_interval_str:
+                try:
+                    POLL_INTERVAL = max(1.0, float(poll_interval_str))
+                except ValueError:
+                    print(f"Warning: Invalid poll_interval '{poll_interval_str}' in {path}, using {POLL_INTERVAL} seconds")
+        
+        if "processing" in config:
+            jobs_str = config["processing"].get("jobs", "")
+            if jobs_str:
+                try:
+                    CONFIGURED_JOBS = max(1, int(jobs_str))
+                except ValueError:
+                    print(f"Warning: Invalid jobs '{jobs_str}' in {path}, using the default worker count")
+        
+        break  # Successfully loaded a config, no need to try other paths
+    
+    # Use absolute, normalized paths from here on, so later checks and messages
+    # never need to resolve them again
+    SOURCE_DIR = os.path.abspath(SOURCE_DIR)
+    DEST_DIR = os.path.abspath(DEST_DIR)
     
     # Initialize statistics file path and load statistics after DEST_DIR is set
     initialize_statistics_file()
@@ -144,99 +275,125 @@ def initialize_statistics_file():
     STATS_FILE = os.path.join(DEST_DIR, "Photo_Organizer_Statistics.json")
     STATS_FILE = os.path.abspath(STATS_FILE)
 
+def _read_statistics_file():
+    """Read and decode the statistics file."""
+    with open(STATS_FILE, 'rb') as f:
+        return _json_loads(f.read())
+
 def load_statistics():
-    """Load statistics from JSON file."""
+    """Load statistics from JSON file.
+    
+    No lock is needed: save_statistics replaces the file with an atomic rename,
+    so a reader sees either the old or the new file, never a partial one.
+    """
     global stats
     if STATS_FILE is None:
         initialize_statistics_file()
     
-    if os.path.exists(STATS_FILE):
+    try:
         try:
-            with open(STATS_FILE, 'r', encoding='utf-8') as f:
-                # Use file locking on Unix/Linux if available
-                if HAS_FCNTL:
-                    try:
-                        fcntl.flock(f.fileno(), fcntl.LOCK_SH)
-                    except (IOError, OSError):
-                        pass  # Locking failed, continue without lock
-                
-                loaded_stats = json.load(f)
-                
-                if HAS_FCNTL:
+            loaded_stats = _read_statistics_file()
+        except FileNotFoundError:
+            # Some filesystems briefly expose a missing file during the rename - retry once
+            loaded_stats = _read_statistics_file()
+        
+        # Merge with defaults (in case new fields were added)
+        for key in stats:
+            if key in loaded_stats:
+                if key == "last_updated":
+                    stats[key] = loaded_stats[key]
+                else:
+                    # Ensure numeric values
                     try:
-                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                    except (IOError, OSError):
-                        pass
-                
-                # Merge with defaults (in case new fields were added)
-                for key in stats:
-                    if key in loaded_stats:
-                        if key == "last_updated":
-                            stats[key] = loaded_stats[key]
-                        else:
-                            # Ensure numeric values
-                            try:
-                                stats[key] = int(loaded_stats[key])
-                            except (ValueError, TypeError):
-                                stats[key] = 0
-        except Exception as e:
-            log_system_event("Warning", f"Error loading statistics: {e}")
+                        stats[key] = int(loaded_stats[key])
+                    except (ValueError, TypeError):
+                        stats[key] = 0
+    except FileNotFoundError:
+        pass  # No statistics saved yet
+    except Exception as e:
+        log_system_event("Warning", f"Error loading statistics: {e}")
 
 def save_statistics(force=False):
-    """Save statistics to JSON file with file locking.
+    """Save statistics to JSON file atomically.
+    
+    The file is written to a temporary file first and then renamed over the
+    statistics file, so readers never see a partially written file. Writers in
+    this process are serialized by _stats_write_lock; the temporary file name
+    includes the process ID so separate processes never share one. _stats_lock is
+    only held to copy the counters, so a slow write or fsync never blocks
+    record_file_operation().
     
     Args:
-        force: If True, save immediately regardless of counter
+        force: Kept for compatibility - statistics are always written immediately
     """
-    global stats, _stats_save_counter
+    global _stats_dirty
     if STATS_FILE is None:
         initialize_statistics_file()
     
-    stats["last_updated"] = datetime.now().isoformat()
-    
-    try:
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
+    # The snapshot is taken after the write lock, so a newer snapshot is never
+    # overwritten by an older one
+    with _stats_write_lock:
+        with _stats_lock:
+            _stats_dirty = False
+            stats["last_updated"] = datetime.now().isoformat()
+            snapshot = dict(stats)
+        temp_file = f"{STATS_FILE}.tmp.{os.getpid()}"
         
-        # Write with file locking
-        with open(STATS_FILE, 'w', encoding='utf-8') as f:
-            if HAS_FCNTL:
-                try:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-                except (IOError, OSError):
-                    pass  # Locking failed, continue without lock
-            
-            json.dump(stats, f, indent=2)
+        try:
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
             
-            if HAS_FCNTL:
-                try:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                except (IOError, OSError):
-                    pass
-        
-        # Reset counter if forced save
-        if force:
-            _stats_save_counter = 0
-    except Exception as e:
-        log_system_event("Error", f"Error saving statistics: {e}")
+            with open(temp_file, 'wb') as f:
+                f.write(_json_dumps_bytes(snapshot))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, STATS_FILE)
+        except Exception as e:
+            log_system_event("Error", f"Error saving statistics: {e}")
+
+def _statistics_writer():
+    """Background thread that coalesces save requests into a single write."""
+    while True:
+        _stats_save_queue.get()
+        # Collect further requests until STATS_SAVE_INTERVAL seconds have passed
+        # or STATS_SAVE_MAX_PENDING files have changed the counters
+        pending = 1
+        deadline = time.monotonic() + STATS_SAVE_INTERVAL
+        while pending < STATS_SAVE_MAX_PENDING:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                _stats_save_queue.get(timeout=remaining)
+                pending += 1
+            except queue.Empty:
+                break
+        if _stats_dirty:
+            save_statistics()
 
 def save_statistics_if_needed(force=False):
-    """Save statistics periodically (every 10 operations or 30 seconds timeout) or when forced."""
-    global _stats_save_counter, _stats_last_save_time
+    """Mark statistics as changed and request a save, or save immediately when forced.
     
-    _stats_save_counter += 1
-    current_time = time.time()
+    Requests are handled by a background writer thread that writes all requests
+    made within STATS_SAVE_INTERVAL seconds (at most STATS_SAVE_MAX_PENDING) with a
+    single save. Unsaved changes are written at exit by flush_statistics().
+    """
+    global _stats_writer_thread, _stats_dirty
     
-    # Initialize last save time if not set
-    if _stats_last_save_time is None:
-        _stats_last_save_time = current_time
+    _stats_dirty = True
+    if force:
+        save_statistics()
+        return
     
-    # Save every 10 operations, after 30 seconds timeout, or when forced
-    time_since_last_save = current_time - _stats_last_save_time
-    if force or _stats_save_counter >= 10 or time_since_last_save >= 30:
+    if _stats_writer_thread is None:
+        _stats_writer_thread = threading.Thread(target=_statistics_writer, name="StatisticsWriter", daemon=True)
+        _stats_writer_thread.start()
+    _stats_save_queue.put(None)
+
+def flush_statistics():
+    """Save statistics now if they changed since the last save."""
+    if _stats_dirty:
         save_statistics()
-        _stats_save_counter = 0
-        _stats_last_save_time = current_time
 
 # Log file path - stored in DEST_DIR
 LOG_FILE = os.path.join(DEST_DIR, "Photo_Organizer_Activities.log")
@@ -262,17 +419,133 @@ stats = {
     "last_updated": None
 }
 
-# Counter for batch saving (save every 10 operations)
-_stats_save_counter = 0
-_stats_last_save_time = None
+# Background statistics writer (started on first save request): statistics are
+# written at most every STATS_SAVE_INTERVAL seconds, or after STATS_SAVE_MAX_PENDING changes
+STATS_SAVE_INTERVAL = 5.0
+STATS_SAVE_MAX_PENDING = 100
+_stats_save_queue = queue.Queue()
+_stats_writer_thread = None
+_stats_lock = threading.Lock()
+# Serializes statistics file writes (held without _stats_lock while writing)
+_stats_write_lock = threading.Lock()
+# True when counters changed since the last save
+_stats_dirty = False
 
 # Legacy variables for backward compatibility with existing log_statistics function
 bytes_moved = 0
 bytes_deleted = 0
+
+def record_file_operation(operation, file_size, count=1):
+    """Count files in the statistics (callers request the save).
+    
+    The file and byte counters of an operation are updated together under _stats_lock,
+    so a concurrent save_statistics() never writes one without the other.
+    
+    Args:
+        operation: 'moved_to_destination', 'moved_to_duplicates' or 'deleted'
+        file_size: Size of each counted file in bytes
+        count: Number of files to add; negative to take back earlier counts (never below zero)
+    """
+    global bytes_moved, bytes_deleted
+    files_key = f"files_{operation}"
+    bytes_key = f"bytes_{operation}"
+    byte_count = file_size * count
+    with _stats_lock:
+        stats[files_key] = max(0, stats[files_key] + count)
+        stats[bytes_key] = max(0, stats[bytes_key] + byte_count)
+        # Legacy compatibility
+        if operation == "deleted":
+            bytes_deleted = max(0, bytes_deleted + byte_count)
+        else:
+            bytes_moved = max(0, bytes_moved + byte_count)
+
+# Seconds allowed after a stop signal for saving statistics and logs before exiting anyway
+SHUTDOWN_TIMEOUT = 5.0
+# Set by the signal handler; the main thread notices it, stops and saves statistics and
+# logs itself, so the handler never waits for a lock the interrupted code holds
+_stop_requested = threading.Event()
+
+# Seconds without file activity after which the session statistics are logged and reset.
+# Activity times are time.monotonic() values, so clock changes (NTP) do not trigger resets
+IDLE_RESET_TIMEOUT = 60.0
+
+# Coarse time.monotonic() value, refreshed every COARSE_CLOCK_INTERVAL seconds by a
+# background thread (started by start_watching()); precise enough for idle tracking
+COARSE_CLOCK_INTERVAL = 1.0
+coarse_now = time.monotonic()
+_coarse_clock_thread = None
+
+def _coarse_clock():
+    """Background thread that keeps coarse_now current."""
+    global coarse_now
+    while True:
+        time.sleep(COARSE_CLOCK_INTERVAL)
+        coarse_now = time.monotonic()
+
+def start_coarse_clock():
+    """Start the coarse clock thread (once)."""
+    global _coarse_clock_thread, coarse_now
+    if _coarse_clock_thread is None:
+        coarse_now = time.monotonic()
+        _coarse_clock_thread = threading.Thread(target=_coarse_clock, name="CoarseClock", daemon=True)
+        _coarse_clock_thread.start()
+
 last_file_detected_time = None
 last_statistics_log_time = None
 statistics_reset_time = None
-statistics_already_logged = False  # Flag to prevent duplicate logging on exit
+# Set once the exit statistics were logged, to prevent duplicate logging on exit.
+# _stats_logged_claim is acquired (never released) by the first caller: a non-blocking
+# acquire is atomic, even when a signal handler interrupts the atexit handler
+_stats_logged = threading.Event()
+_stats_logged_claim = threading.Lock()
+
+def _claim_exit_statistics_log():
+    """Return True for the first caller only, and mark the exit statistics as logged."""
+    if not _stats_logged_claim.acquire(blocking=False):
+        return False
+    _stats_logged.set()
+    return True
+
+# Third-party packages checked by test_dependencies(): required packages are imported,
+# so a broken install (e.g. a C extension built for another CPU) fails at startup;
+# optional packages are only looked up and imported on first use
+# (pip name, module, version attribute, required, purpose, fallback when missing)
+DEPENDENCIES = [
+    ('Pillow', 'PIL.Image', '__version__', True, None, None),
+    ('watchdog', 'watchdog.observers', None, True, None, None),
+    ('imagehash', 'imagehash', None, False, None, None),
+    ('mutagen', 'mutagen', None, False, 'for video metadata', 'video files will use file date'),
+    ('blake3', 'blake3', '__version__', False, 'for fast duplicate detection', 'duplicate detection will use xxHash or MD5'),
+    ('xxhash', 'xxhash', None, False, 'for fast duplicate detection', 'duplicate detection will use MD5'),
+    ('orjson', 'orjson', '__version__', False, 'for fast statistics file access', 'statistics will use the json module'),
+    ('watchfiles', 'watchfiles', '__version__', False, 'for native folder monitoring', 'folder monitoring will use watchdog'),
+]
+if is_synology_nas():
+    DEPENDENCIES.append(('inotify_simple', 'inotify_simple', None, False,
+                         'for native folder monitoring', 'folder monitoring will use watchdog'))
+
+def _module_installed(module_name):
+    """Check whether a module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def _installed_version(name, module_name, version_attr):
+    """Return the version of an installed package ('' if unknown) without importing it.
+    
+    The version comes from the package metadata; on Python 3.7, which lacks
+    importlib.metadata, it is only known for modules that are already imported.
+    """
+    try:
+        import importlib.metadata as importlib_metadata
+    except ImportError:
+        module = sys.modules.get(module_name)
+        return getattr(module, version_attr, '') if module is not None else ''
+    try:
+        return importlib_metadata.version(name)
+    except Exception:
+        return ''
 
 def test_dependencies():
     """Test if all required dependencies are installed."""
@@ -298,67 +571,56 @@ def test_dependencies():
         log_system_event("Error", f"Dependency check failed: Python {python_version.major}.{python_version.minor} (requires 3.7+)")
     
     # Test built-in modules
-    builtin_modules = ['os', 'shutil', 'time', 'hashlib', 'socket', 'getpass', 'datetime']
+    builtin_modules = ['os', 'time', 'hashlib', 'socket', 'getpass', 'datetime']
     for module in builtin_modules:
-        try:
-            __import__(module)
+        if _module_installed(module):
             print(f"✓ {module} (built-in)")
-        except ImportError:
+        else:
             print(f"✗ {module} (built-in, should always be available)")
             missing_deps.append(module)
             log_system_event("Error", f"Dependency check failed: {module} module not available")
     
-    # Test Pillow
-    try:
-        from PIL import Image
-        from PIL.ExifTags import TAGS
-        version = Image.__version__
-        print(f"✓ Pillow (version: {version})")
-        installed_deps.append(f"Pillow {version}")
-    except ImportError:
-        print("✗ Pillow is NOT installed")
-        print("  Install with: pip install Pillow")
-        missing_deps.append("Pillow")
-        log_system_event("Error", "Dependency check failed: Pillow is not installed")
-    
-    # Test watchdog
-    try:
-        from watchdog.observers import Observer
-        from watchdog.events import FileSystemEventHandler
-        print("✓ watchdog")
-        installed_deps.append("watchdog")
-    except ImportError:
-        print("✗ watchdog is NOT installed")
-        print("  Install with: pip install watchdog")
-        missing_deps.append("watchdog")
-        log_system_event("Error", "Dependency check failed: watchdog is not installed")
-    
-    # Test imagehash (optional)
-    try:
-        import imagehash
-        print("✓ imagehash (optional)")
-        installed_deps.append("imagehash")
-    except ImportError:
-        print("⚠ imagehash is NOT installed (optional)")
-        print("  Install with: pip install imagehash")
-        warnings.append("imagehash (optional)")
-        log_system_event("Warning", "Dependency check: imagehash (optional) is not installed")
-    
-    # Test mutagen (optional, for video file metadata)
-    # Try importing mutagen directly to check if it's available
-    try:
-        import mutagen
-        from mutagen.mp4 import MP4
-        # Note: QuickTime module doesn't exist in mutagen 1.47.0+, MOV files use MP4
-        print("✓ mutagen (optional, for video metadata)")
-        installed_deps.append("mutagen")
-    except ImportError:
-        print("⚠ mutagen is NOT installed (optional, for video metadata)")
-        print("  Install with: pip install mutagen")
-        print("  Or install all dependencies: pip install -r requirements.txt")
-        print("  Note: Video files will use file creation/modification date if mutagen is not installed")
-        warnings.append("mutagen (optional)")
-        log_system_event("Warning", "Dependency check: mutagen (optional) is not installed - video files will use file date")
+    # Test third-party packages
+    for name, module_name, version_attr, required, purpose, fallback in DEPENDENCIES:
+        module = None
+        if required:
+            try:
+                module = importlib.import_module(module_name)
+                installed = True
+            except (ImportError, OSError, AttributeError):
+                installed = False
+        else:
+            installed = _module_installed(module_name)
+        if not installed:
+            if required:
+                print(f"✗ {name} is NOT installed")
+                print(f"  Install with: pip install {name}")
+                missing_deps.append(name)
+                log_system_event("Error", f"Dependency check failed: {name} is not installed")
+            else:
+                description = f"optional, {purpose}" if purpose else "optional"
+                print(f"⚠ {name} is NOT installed ({description})")
+                print(f"  Install with: pip install {name}")
+                if fallback:
+                    print(f"  Note: {fallback[0].upper()}{fallback[1:]} if {name} is not installed")
+                warnings.append(f"{name} (optional)")
+                message = f"Dependency check: {name} (optional) is not installed"
+                if fallback:
+                    message += f" - {fallback}"
+                log_system_event("Warning", message)
+            continue
+        
+        if not version_attr:
+            version = ''
+        elif module is not None:
+            version = getattr(module, version_attr, '')
+        else:
+            version = _installed_version(name, module_name, version_attr)
+        if required:
+            print(f"✓ {name} (version: {version})" if version else f"✓ {name}")
+        else:
+            print(f"✓ {name} (optional, {purpose})" if purpose else f"✓ {name} (optional)")
+        installed_deps.append(f"{name} {version}" if version else name)
     
     print("=" * 60)
     
@@ -369,7 +631,7 @@ def test_dependencies():
         print()
         print("Install missing packages with:")
         print("  pip install -r requirements.txt")
-        print("  Or individually: pip install Pillow watchdog imagehash mutagen")
+        print("  Or individually: pip install Pillow watchdog imagehash mutagen xxhash")
         print()
         log_system_event("Error", f"Dependency check completed: Missing required dependencies - {', '.join(missing_deps)}")
         return False
@@ -394,6 +656,7 @@ def get_local_ip():
         return _cached_ip
     
     try:
+        import socket
         # Connect to a remote address to determine local IP
         with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
             s.connect(("8.8.8.8", 80))
@@ -403,35 +666,22 @@ def get_local_ip():
         _cached_ip = "127.0.0.1"
         return _cached_ip
 
-def format_file_size(size_bytes):
-    """Format file size in human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.2f} PB"
+def _file_has_content(path):
+    """Check if a file exists and is not empty with a single stat() call."""
+    try:
+        return os.stat(path).st_size > 0
+    except OSError:
+        return False
 
 def initialize_log_file():
     """Initialize the log file with header if it doesn't exist or is empty."""
     global LOG_FILE_INITIALIZED
     if not LOG_FILE_INITIALIZED:
-        # Check if file exists and has content
-        file_exists = os.path.exists(LOG_FILE)
-        file_has_content = False
-        if file_exists:
-            try:
-                file_has_content = os.path.getsize(LOG_FILE) > 0
-            except Exception:
-                file_has_content = False
-        
         # Only initialize if file doesn't exist or is empty
-        if not file_exists or not file_has_content:
-            try:
-                with open(LOG_FILE, 'w', encoding='utf-8') as f:
-                    f.write("# Time, IP address, User, File name, File size, Event, Additional Info, File/Folder\n")
-                LOG_FILE_INITIALIZED = True
-            except Exception as e:
-                print(f"Error initializing log file: {e}")
+        if not _file_has_content(LOG_FILE):
+            # Written through the same persistent handle as the log lines that follow
+            write_log_line(LOG_FILE, "# Time, IP address, User, File name, File size, Event, Additional Info, File/Folder\n")
+            LOG_FILE_INITIALIZED = True
         else:
             # File exists and has content - preserve it, just mark as initialized
             LOG_FILE_INITIALIZED = True
@@ -440,45 +690,29 @@ def initialize_system_log():
     """Initialize the system log file with header if it doesn't exist or is empty."""
     global SYSTEM_LOG_INITIALIZED
     if not SYSTEM_LOG_INITIALIZED:
-        # Check if file exists and has content
-        file_exists = os.path.exists(SYSTEM_LOG_FILE)
-        file_has_content = False
-        if file_exists:
-            try:
-                file_has_content = os.path.getsize(SYSTEM_LOG_FILE) > 0
-            except Exception:
-                file_has_content = False
-        
         # Only initialize if file doesn't exist or is empty
-        if not file_exists or not file_has_content:
-            try:
-                with open(SYSTEM_LOG_FILE, 'w', encoding='utf-8') as f:
-                    f.write("# Level, Log, Time, User, Event\n")
-                SYSTEM_LOG_INITIALIZED = True
-            except Exception as e:
-                print(f"Error initializing system log file: {e}")
+        if not _file_has_content(SYSTEM_LOG_FILE):
+            # Written through the same persistent handle as the log lines that follow
+            write_log_line(SYSTEM_LOG_FILE, "# Level, Log, Time, User, Event\n")
+            SYSTEM_LOG_INITIALIZED = True
         else:
             # File exists and has content - preserve it, just mark as initialized
             SYSTEM_LOG_INITIALIZED = True
 
+# Size units for format_bytes(), one per power of 1024
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
 def format_bytes(bytes_value):
     """Format bytes into human-readable format (KB, MB, GB, etc.) with up to 2 decimal places."""
-    if bytes_value == 0:
+    bytes_value = int(bytes_value)
+    if bytes_value <= 0:
         return "0 B"
     
-    units = ['B', 'KB', 'MB', 'GB', 'TB', 'PB']
-    unit_index = 0
-    size = float(bytes_value)
-    
-    while size >= 1024.0 and unit_index < len(units) - 1:
-        size /= 1024.0
-        unit_index += 1
-    
-    # Format with up to 2 decimal places
+    # Each unit is 2^10 larger than the previous one, so the bit length selects the unit
+    unit_index = min((bytes_value.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
     if unit_index == 0:  # Bytes - no decimals
-        return f"{int(size)} {units[unit_index]}"
-    else:
-        return f"{size:.2f} {units[unit_index]}"
+        return f"{bytes_value} B"
+    return f"{bytes_value / (1 << (unit_index * 10)):.2f} {SIZE_UNITS[unit_index]}"
 
 def log_statistics(reason="service stopped", force=False):
     """Log statistics to system log when script stops or idle.
@@ -487,10 +721,10 @@ def log_statistics(reason="service stopped", force=False):
         reason: Reason for logging statistics (e.g., "service stopped", "idle timeout")
         force: If True, log even if already logged (for idle timeout resets)
     """
-    global bytes_moved, bytes_deleted, last_statistics_log_time, statistics_already_logged
+    global bytes_moved, bytes_deleted, last_statistics_log_time
     
     # Prevent duplicate logging on exit (unless forced, e.g., for idle timeout)
-    if not force and statistics_already_logged and reason == "service stopped":
+    if reason == "service stopped" and not _claim_exit_statistics_log() and not force:
         return
     
     # Save statistics before logging (force save)
@@ -500,10 +734,104 @@ def log_statistics(reason="service stopped", force=False):
     # No longer logging detailed statistics to application log
     
     last_statistics_log_time = time.time()
+
+def get_current_user():
+    """Get the name of the user running the service."""
+    try:
+        return getpass.getuser()
+    except Exception:
+        return os.getenv('USER', os.getenv('USERNAME', 'system'))
+
+# The service user cannot change while running, so look it up once
+CURRENT_USER = get_current_user()
+
+def format_log_timestamp(date_separator):
+    """Format the current local time as YYYY<sep>MM<sep>DD HH:MM:SS for log lines."""
+    lt = time.localtime()
+    return (f"{lt.tm_year}{date_separator}{lt.tm_mon:02d}{date_separator}{lt.tm_mday:02d} "
+            f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d}")
+
+# Persistent, buffered log file handles (opened on first write). Log lines are queued
+# by the processing threads and written in batches by a background writer thread,
+# at least every LOG_FLUSH_INTERVAL seconds or once LOG_BATCH_SIZE lines are queued
+LOG_BUFFER_SIZE = 1 << 20
+LOG_FLUSH_INTERVAL = 1.0
+LOG_BATCH_SIZE = 100
+_log_handles = {}
+_log_lock = threading.Lock()
+# Queued (log path, line) entries; a log path of None prints the line to the console
+_log_queue = collections.deque()
+_log_wakeup = threading.Event()
+_log_writer_thread = None
+
+def _write_queued_logs():
+    """Write all queued log lines and flush them to disk. Must be called with _log_lock held."""
+    lines_by_path = {}
+    while True:
+        try:
+            log_path, line = _log_queue.popleft()
+        except IndexError:
+            break
+        lines_by_path.setdefault(log_path, []).append(line)
+    
+    for log_path, lines in lines_by_path.items():
+        if log_path is None:
+            sys.stdout.write(''.join(lines))
+            continue
+        try:
+            handle = _log_handles.get(log_path)
+            if handle is None:
+                handle = open(log_path, 'a', encoding='utf-8', buffering=LOG_BUFFER_SIZE)
+                _log_handles[log_path] = handle
+            handle.writelines(lines)
+        except Exception as e:
+            print(f"Error writing to log file {log_path}: {e}")
     
-    # Mark as logged if this is an exit-related log
-    if reason == "service stopped":
-        statistics_already_logged = True
+    for log_path, handle in list(_log_handles.items()):
+        try:
+            handle.flush()
+        except Exception as e:
+            print(f"Error flushing log file {log_path}: {e}")
+
+def _log_writer():
+    """Background thread that writes queued log lines in batches."""
+    while True:
+        _log_wakeup.wait(LOG_FLUSH_INTERVAL)
+        _log_wakeup.clear()
+        if _log_queue:
+            flush_logs()
+
+def write_log_line(log_path, line):
+    """Queue a line for a log file (or for the console if log_path is None); returns immediately."""
+    global _log_writer_thread
+    if _log_writer_thread is None:
+        with _log_lock:
+            if _log_writer_thread is None:
+                _log_writer_thread = threading.Thread(target=_log_writer, name="LogWriter", daemon=True)
+                _log_writer_thread.start()
+    _log_queue.append((log_path, line))
+    if len(_log_queue) >= LOG_BATCH_SIZE:
+        _log_wakeup.set()
+
+def flush_logs():
+    """Write all queued log lines and flush them to disk."""
+    with _log_lock:
+        _write_queued_logs()
+
+def close_logs():
+    """Write queued log lines, then flush and close all log file handles."""
+    with _log_lock:
+        _write_queued_logs()
+        for handle in _log_handles.values():
+            try:
+                handle.close()
+            except Exception:
+                pass
+        _log_handles.clear()
+
+atexit.register(close_logs)
+# Registered after close_logs so it runs first (atexit is LIFO) and can still log errors
+atexit.register(flush_statistics)
 
 def log_system_event(level, event_message):
     """Log system events (start, stop, dependencies check, etc.).
@@ -518,18 +846,12 @@ def log_system_event(level, event_message):
     initialize_system_log()
     
     # Get current time in format: 2025/11/22 01:30:54
-    current_time = datetime.now().strftime('%Y/%m/%d %H:%M:%S')
-    
-    # Get user
-    try:
-        user = getpass.getuser()
-    except Exception:
-        user = os.getenv('USER', os.getenv('USERNAME', 'system'))
+    current_time = format_log_timestamp('/')
+    user = CURRENT_USER
     
     # Write to system log file
     try:
-        with open(SYSTEM_LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(f"{level}, System, {current_time}, {user}, {event_message}\n")
+        write_log_line(SYSTEM_LOG_FILE, f"{level}, System, {current_time}, {user}, {event_message}\n")
     except Exception as e:
         print(f"Error writing to system log file: {e}")
 
@@ -537,21 +859,16 @@ def log_file_event(event_type, file_path, dest_path=None, file_size=None, additi
     """Log file event to Photo_Organizer_Activities.log.
     
     Columns: Time, IP address, User, File name, File size, Event, Additional Info, File/Folder
-    Saves to log file and prints to console.
+    Queues the line for the log file and the console (see write_log_line()).
     """
     global LOG_FILE_INITIALIZED
     
     # Initialize log file if needed
     initialize_log_file()
     
-    # Get current time
-    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    # Get user
-    try:
-        user = getpass.getuser()
-    except Exception:
-        user = os.getenv('USER', os.getenv('USERNAME', 'system'))
+    # Get current time in format: 2025-11-22 01:30:54
+    current_time = format_log_timestamp('-')
+    user = CURRENT_USER
     
     # Get IP address
     ip_address = get_local_ip()
@@ -564,7 +881,7 @@ def log_file_event(event_type, file_path, dest_path=None, file_size=None, additi
             file_size = 0
     
     # Format file size
-    size_str = format_file_size(file_size)
+    size_str = format_bytes(file_size)
     
     # Get file name
     file_name = os.path.basename(file_path)
@@ -574,12 +891,11 @@ def log_file_event(event_type, file_path, dest_path=None, file_size=None, additi
     
     # Write to log file
     try:
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
-            log_line = f"{current_time}, {ip_address}, {user}, {file_name}, {size_str}, {event_type}"
-            if additional_info:
-                log_line += f", {additional_info}"
-            log_line += f", {file_folder}\n"
-            f.write(log_line)
+        log_line = f"{current_time}, {ip_address}, {user}, {file_name}, {size_str}, {event_type}"
+        if additional_info:
+            log_line += f", {additional_info}"
+        log_line += f", {file_folder}\n"
+        write_log_line(LOG_FILE, log_line)
     except Exception as e:
         print(f"Error writing to log file: {e}")
     
@@ -587,295 +903,620 @@ def log_file_event(event_type, file_path, dest_path=None, file_size=None, additi
     log_entry = f"{current_time}\t{ip_address}\t{user}\t{file_name}\t{size_str}\t{event_type}"
     if additional_info:
         log_entry += f"\t{additional_info}"
-    log_entry += f"\t{file_folder}"
-    print(log_entry)
+    log_entry += f"\t{file_folder}\n"
+    write_log_line(None, log_entry)
 
 # Ensure destination directory exists
+# Directories already created or verified by ensure_dir() in this process
+_known_dirs = set()
+
 def ensure_dir(path):
-    if not os.path.exists(path):
-        os.makedirs(path)
+    """Create a directory if needed; directories seen before are not checked again.
+    
+    Callers that find a cached directory missing (removed externally) should
+    discard it from _known_dirs so the next call recreates it; move_into_dir()
+    does this for moves.
+    """
+    if path in _known_dirs:
+        return
+    os.makedirs(path, exist_ok=True)
+    _known_dirs.add(path)
+
+# Short-lived stat() results of destination folders, whose mtime tells the folder
+# caches below when to re-read a folder: path -> (expiry time.monotonic(), stat result).
+# Changes made by this script invalidate entries (see fast_move()); changes made by
+# others are noticed after at most STAT_CACHE_TTL seconds
+STAT_CACHE_TTL = 2.0
+STAT_CACHE_MAX_ENTRIES = 10000
+_stat_cache = collections.OrderedDict()
+
+def cached_stat(path):
+    """os.stat() a folder, reusing a result younger than STAT_CACHE_TTL seconds.
+    
+    Callers hold _file_operation_lock (or run before the worker pool starts).
+    
+    Raises:
+        OSError if the path cannot be stat'ed (failures are not cached)
+    """
+    now = time.monotonic()
+    cached = _stat_cache.get(path)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    path_stat = os.stat(path)
+    _stat_cache[path] = (now + STAT_CACHE_TTL, path_stat)
+    _stat_cache.move_to_end(path)
+    if len(_stat_cache) > STAT_CACHE_MAX_ENTRIES:
+        _stat_cache.popitem(last=False)
+    return path_stat
+
+def invalidate_stat(path):
+    """Drop the cached stat() result of a path after this script changed it."""
+    _stat_cache.pop(path, None)
+
+# Absolute source directory and its prefix for containment checks, cached per
+# SOURCE_DIR value: (SOURCE_DIR, absolute path, absolute path + os.sep)
+_abs_source_dir = (None, None, None)
+
+def get_abs_source_dir():
+    """Return os.path.abspath(SOURCE_DIR), computed once per configured SOURCE_DIR."""
+    global _abs_source_dir
+    if _abs_source_dir[0] != SOURCE_DIR:
+        abs_source_dir = os.path.abspath(SOURCE_DIR)
+        _abs_source_dir = (SOURCE_DIR, abs_source_dir, os.path.join(abs_source_dir, ''))
+    return _abs_source_dir[1]
+
+def is_in_source_dir(path):
+    """Check whether a path is the source directory or inside it.
+    
+    Absolute, normalized paths (as produced by the scanners and watchers) are checked
+    with a plain prefix comparison; other paths are normalized with os.path.abspath first.
+    """
+    abs_source_dir = get_abs_source_dir()
+    # Paths with '.', '..' or empty components need normalizing before comparison
+    if not os.path.isabs(path) or os.sep + '.' in path or os.sep + os.sep in path:
+        path = os.path.abspath(path)
+    return path == abs_source_dir or path.startswith(_abs_source_dir[2])
+
+# Bytes copied per system call when moving files between devices
+COPY_CHUNK_SIZE = 1 << 20
+
+def _copy_file_data(src_fd, dst_fd):
+    """Copy the remaining contents of src_fd to dst_fd.
+    
+    Uses os.copy_file_range() (copy inside the kernel, Linux 4.5+ / Python 3.8+),
+    then os.sendfile(), and finally a read/write loop with a reused buffer.
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while os.copy_file_range(src_fd, dst_fd, COPY_CHUNK_SIZE):
+                pass
+            return
+        except OSError as e:
+            # Not supported for this kernel or file system pair; fall through
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM):
+                raise
+    if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        offset = os.lseek(src_fd, 0, os.SEEK_CUR)
+        try:
+            while True:
+                sent = os.sendfile(dst_fd, src_fd, offset, COPY_CHUNK_SIZE)
+                if not sent:
+                    break
+                offset += sent
+            return
+        except OSError as e:
+            if e.errno not in (errno.ENOSYS, errno.EINVAL):
+                raise
+            os.lseek(src_fd, offset, os.SEEK_SET)
+    buffer = bytearray(COPY_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(src_fd, 'rb', buffering=0, closefd=False) as src_file:
+        while True:
+            read = src_file.readinto(buffer)
+            if not read:
+                break
+            written = 0
+            while written < read:
+                written += os.write(dst_fd, view[written:read])
+
+def _move_across_devices(src, dst):
+    """Move a file to another file system: copy, preserve timestamps and mode, delete the source.
+    
+    The data is written to a temporary file next to dst that is renamed into place
+    once complete, so a partially copied file never appears under the final name.
+    """
+    temp_path = f"{dst}.tmp.{os.getpid()}"
+    binary_flag = getattr(os, 'O_BINARY', 0)  # Windows only
+    src_fd = os.open(src, os.O_RDONLY | binary_flag)
+    try:
+        src_stat = os.fstat(src_fd)
+        dst_fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | binary_flag,
+                         stat.S_IMODE(src_stat.st_mode))
+        try:
+            _copy_file_data(src_fd, dst_fd)
+        except BaseException:
+            os.close(dst_fd)
+            os.remove(temp_path)
+            raise
+        os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    try:
+        os.utime(temp_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.replace(temp_path, dst)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    os.remove(src)
+
+def fast_move(src, dst):
+    """Move a file with a single rename when possible.
+    
+    os.replace() is tried for every move, since source and destination folders may
+    be on different mounts for some moves only; files are copied with
+    _move_across_devices() when the rename fails with EXDEV.
+    """
+    # Both folders change, so their cached stat() results are no longer valid
+    invalidate_stat(os.path.dirname(src))
+    invalidate_stat(os.path.dirname(dst))
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        _move_across_devices(src, dst)
+
+def move_into_dir(src, dst):
+    """fast_move() a file into a folder that was created with ensure_dir().
+    
+    If the folder was removed externally since ensure_dir() last saw it, it is
+    forgotten (including its folder caches), recreated and the move is tried once more.
+    """
+    try:
+        fast_move(src, dst)
+    except FileNotFoundError:
+        folder = os.path.dirname(dst)
+        _known_dirs.discard(folder)
+        if os.path.isdir(folder) or not os.path.exists(src):
+            raise  # The source file is gone, not the folder
+        _folder_index.pop(folder, None)
+        _folder_names.pop(folder, None)
+        ensure_dir(folder)
+        fast_move(src, dst)
+
+# Synology indexer tool (availability checked once at startup)
+SYNOINDEX_PATH = '/usr/syno/bin/synoindex'
+HAS_SYNOINDEX = is_synology_nas() and os.path.exists(SYNOINDEX_PATH)
+
+# Indexer updates are queued and applied in batches by a background thread
+SYNOINDEX_BATCH_INTERVAL = 2.0
+# Folders with more changed files than this in one batch are re-indexed with a single
+# synoindex call; fewer files are updated one call per file, so a folder holding
+# thousands of photos is not re-scanned for every few new ones
+SYNOINDEX_FOLDER_THRESHOLD = 8
+_index_queue = queue.Queue()
+_indexer_thread = None
+
+def _run_synoindex(args):
+    """Run synoindex with the given arguments, ignoring failures."""
+    try:
+        import subprocess
+        subprocess.run([SYNOINDEX_PATH] + args,
+                       check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+    except Exception:
+        pass  # Silently fail if synoindex is not available or times out
+
+def _apply_index_updates(updates):
+    """Apply a batch of (old_path, new_path) indexer updates.
+    
+    Changes are grouped by folder. A folder with more than SYNOINDEX_FOLDER_THRESHOLD
+    changed files costs a single synoindex call: -R re-indexes a folder files were
+    removed from (dropping the entries of files that are gone), -A indexes a folder
+    files were added to. Other files are updated individually with -d and -a.
+    """
+    removed_by_folder = {}
+    added_by_folder = {}
+    for old_path, new_path in updates:
+        if old_path:
+            removed = removed_by_folder.setdefault(os.path.dirname(old_path), [])
+            if old_path not in removed:
+                removed.append(old_path)
+        if new_path:
+            added = added_by_folder.setdefault(os.path.dirname(new_path), [])
+            if new_path not in added:
+                added.append(new_path)
+    
+    for folder, paths in removed_by_folder.items():
+        if len(paths) > SYNOINDEX_FOLDER_THRESHOLD:
+            if os.path.isdir(folder):
+                _run_synoindex(['-R', folder])
+                added_by_folder.pop(folder, None)  # Re-indexing also picks up added files
+        else:
+            for path in paths:
+                _run_synoindex(['-d', path])
+    for folder, paths in added_by_folder.items():
+        if len(paths) > SYNOINDEX_FOLDER_THRESHOLD:
+            if os.path.isdir(folder):
+                _run_synoindex(['-A', folder])
+        else:
+            for path in paths:
+                if os.path.exists(path):
+                    _run_synoindex(['-a', path])
+
+def _drain_index_queue():
+    """Remove and return all queued indexer updates."""
+    updates = []
+    while True:
+        try:
+            updates.append(_index_queue.get_nowait())
+        except queue.Empty:
+            return updates
+
+def _synology_indexer_worker():
+    """Background thread that applies queued indexer updates in batches."""
+    while True:
+        first_update = _index_queue.get()
+        # Collect everything that arrives during the batch interval
+        time.sleep(SYNOINDEX_BATCH_INTERVAL)
+        _apply_index_updates([first_update] + _drain_index_queue())
+
+def flush_synology_indexer():
+    """Apply all pending indexer updates immediately (used on exit)."""
+    updates = _drain_index_queue()
+    if updates:
+        _apply_index_updates(updates)
 
 def update_synology_indexer(old_path=None, new_path=None):
     """Update Synology DSM photo indexer after file operations.
     
+    Updates are queued and applied in batches by a background thread.
+    
     Args:
         old_path: Path to remove from index (if file was moved/deleted)
         new_path: Path to add to index (if file was moved/created)
     """
-    if not is_synology_nas():
+    global _indexer_thread
+    if not HAS_SYNOINDEX or not (old_path or new_path):
         return
     
-    try:
-        # Remove old path from index if provided
-        if old_path and os.path.exists('/usr/syno/bin/synoindex'):
-            try:
-                subprocess.run(['/usr/syno/bin/synoindex', '-D', old_path], 
-                             check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
-            except Exception:
-                pass  # Silently fail if synoindex is not available or times out
-        
-        # Add new path to index if provided
-        if new_path and os.path.exists(new_path) and os.path.exists('/usr/syno/bin/synoindex'):
-            try:
-                subprocess.run(['/usr/syno/bin/synoindex', '-A', new_path], 
-                             check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
-            except Exception:
-                pass  # Silently fail if synoindex is not available or times out
-    except Exception:
-        pass  # Silently fail if indexer update fails
+    if _indexer_thread is None:
+        _indexer_thread = threading.Thread(target=_synology_indexer_worker, name="SynologyIndexer", daemon=True)
+        _indexer_thread.start()
+    _index_queue.put((old_path, new_path))
+
+atexit.register(flush_synology_indexer)
+
+# Thread pool for processing files in parallel (I/O bound, so oversubscribed)
+IO_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+_io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="FileWorker")
+
+def set_io_workers(workers):
+    """Replace the worker pool with one of the given size (call before any work is submitted)."""
+    global IO_WORKERS, _io_pool
+    workers = max(1, workers)
+    if workers == IO_WORKERS:
+        return
+    old_pool = _io_pool
+    IO_WORKERS = workers
+    _io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="FileWorker")
+    old_pool.shutdown(wait=False)
+
+# Files submitted to the worker pool but not yet finished during a scan; the scan waits
+# for the oldest one when the limit is reached, so huge folders do not queue every file at once
+SCAN_MAX_PENDING = 1024
+
+# Serializes destination checks, moves and statistics updates between workers, so
+# duplicate detection and generated file names never race
+_file_operation_lock = threading.Lock()
+
+# Supported media file extensions (lower case, including the dot)
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.m4v', '.mov', '.avi', '.mkv', '.mpg', '.mpeg', 
+                              '.wmv', '.flv', '.webm', '.3gp', '.mts', '.m2ts', '.ts'})
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', 
+                              '.webp', '.heic', '.heif', '.raw', '.cr2', '.nef', '.orf', 
+                              '.sr2', '.arw', '.dng', '.ico', '.svg', '.psd'})
+
+# Extension -> media type lookup table used by classify_file()
+MEDIA_TYPES = dict.fromkeys(VIDEO_EXTENSIONS, 'video')
+MEDIA_TYPES.update(dict.fromkeys(IMAGE_EXTENSIONS, 'image'))
+
+def classify_file(file_path):
+    """Classify a file by extension.
+    
+    Returns:
+        'video', 'image', or None for unknown file types
+    """
+    # Slicing from the last dot is enough: known extensions never contain path separators
+    return MEDIA_TYPES.get(file_path[file_path.rfind('.'):].lower())
 
 def is_video_file(file_path):
     """Check if the file is a video file based on extension."""
-    video_extensions = {'.mp4', '.m4v', '.mov', '.avi', '.mkv', '.mpg', '.mpeg', 
-                       '.wmv', '.flv', '.webm', '.3gp', '.mts', '.m2ts', '.ts'}
-    file_ext = os.path.splitext(file_path)[1].lower()
-    return file_ext in video_extensions
+    return classify_file(file_path) == 'video'
 
 def is_image_file(file_path):
     """Check if the file is an image file based on extension."""
-    image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', 
-                       '.webp', '.heic', '.heif', '.raw', '.cr2', '.nef', '.orf', 
-                       '.sr2', '.arw', '.dng', '.ico', '.svg', '.psd'}
-    file_ext = os.path.splitext(file_path)[1].lower()
-    return file_ext in image_extensions
-
-def get_video_taken_date(video_path):
-    """Get creation date from video file metadata and return as datetime object."""
+    return classify_file(file_path) == 'image'
+
+# Video containers read with mutagen's MP4 module (MOV shares the MP4 container format)
+MP4_EXTENSIONS = frozenset({'.mp4', '.m4v', '.mov'})
+# Recording date atom; '\xa9day' and '©day' are the same string (U+00A9), so one lookup is enough
+MP4_DATE_TAG = '\xa9day'
+
+def _parse_mp4_date(date_str):
+    """Parse an MP4 date tag value ('YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM:SS')."""
+    date_format = '%Y-%m-%dT%H:%M:%S' if 'T' in date_str else '%Y-%m-%d'
     try:
-        # Try using mutagen for MP4/MOV files
-        if MUTAGEN_AVAILABLE:
-            file_ext = os.path.splitext(video_path)[1].lower()
+        return datetime.strptime(date_str, date_format)
+    except ValueError:
+        return None
+
+def _read_video_taken_date(video_path):
+    """Read creation date from video file metadata and return as datetime object."""
+    # Without mutagen (or for other containers) the caller falls back to the file date
+    if video_path[video_path.rfind('.'):].lower() not in MP4_EXTENSIONS or not load_mutagen():
+        return None
+    try:
+        mp4_file = MP4(video_path)
+        if MP4_DATE_TAG in mp4_file:
+            return _parse_mp4_date(mp4_file[MP4_DATE_TAG][0])
+    except Exception:
+        pass  # Error reading video metadata, will fall back to file date
+    return None
+
+# JPEG files are parsed directly from their APP1 segment (see read_jpeg_exif_date)
+JPEG_EXTENSIONS = frozenset({'.jpg', '.jpeg'})
+
+# EXIF metadata is stored near the start of a JPEG; only this many bytes are read
+JPEG_EXIF_READ_SIZE = 65536
+
+# EXIF tag IDs used for date extraction
+EXIF_IFD_POINTER = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+EXIF_DATETIME_DIGITIZED = 0x9004
+EXIF_DATETIME = 0x0132
+
+def _read_tiff_ifd(tiff_data, offset, byte_order):
+    """Read the entries of one TIFF IFD that are relevant for date extraction.
+    
+    Returns:
+        Dict mapping tag ID to an ASCII string or an integer (LONG/IFD values)
+    """
+    entries = {}
+    (entry_count,) = struct.unpack_from(byte_order + 'H', tiff_data, offset)
+    for index in range(entry_count):
+        entry_offset = offset + 2 + index * 12
+        tag, tag_type, count = struct.unpack_from(byte_order + 'HHI', tiff_data, entry_offset)
+        if tag_type == 2:  # ASCII
+            value_offset = entry_offset + 8
+            if count > 4:
+                (value_offset,) = struct.unpack_from(byte_order + 'I', tiff_data, value_offset)
+            raw_value = tiff_data[value_offset:value_offset + count]
+            entries[tag] = raw_value.split(b'\x00', 1)[0].decode('ascii', 'replace').strip()
+        elif tag_type in (4, 13):  # LONG or IFD
+            (entries[tag],) = struct.unpack_from(byte_order + 'I', tiff_data, entry_offset + 8)
+    return entries
+
+def parse_jpeg_exif_date(data):
+    """Extract the raw EXIF date string from the first bytes of a JPEG file.
+    
+    Walks the JPEG markers up to the APP1 Exif segment and reads IFD0 and the
+    ExifIFD without decoding any image data. Priority order matches get_exif_taken_date().
+    
+    Returns:
+        Raw date string ('YYYY:MM:DD HH:MM:SS'), or None if the file has no EXIF date
+    
+    Raises:
+        ValueError or struct.error if the data cannot be parsed (caller should fall back to Pillow)
+    """
+    if data[:2] != b'\xff\xd8':
+        raise ValueError("Not a JPEG file")
+    
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            raise ValueError("Invalid JPEG marker")
+        marker = data[position + 1]
+        if marker == 0xFF:  # Fill byte
+            position += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # Markers without a length
+            position += 2
+            continue
+        if marker in (0xDA, 0xD9):  # Start of scan / end of image - no EXIF segment
+            return None
+        
+        (length,) = struct.unpack_from('>H', data, position + 2)
+        segment_end = position + 2 + length
+        if marker == 0xE1 and data[position + 4:position + 10] == b'Exif\x00\x00':
+            if segment_end > len(data):
+                raise ValueError("Truncated EXIF segment")
+            tiff_data = data[position + 10:segment_end]
+            if tiff_data[:2] == b'II':
+                byte_order = '<'
+            elif tiff_data[:2] == b'MM':
+                byte_order = '>'
+            else:
+                raise ValueError("Invalid TIFF header")
+            magic, ifd0_offset = struct.unpack_from(byte_order + 'HI', tiff_data, 2)
+            if magic != 42:
+                raise ValueError("Invalid TIFF header")
             
-            if file_ext in {'.mp4', '.m4v'}:
-                mp4_file = MP4(video_path)
-                # Try to get creation date from MP4 metadata
-                if '©day' in mp4_file:
-                    date_str = mp4_file['©day'][0]
-                    # Format: 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM:SS'
-                    try:
-                        if 'T' in date_str:
-                            return datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S')
-                        else:
-                            return datetime.strptime(date_str, '%Y-%m-%d')
-                    except ValueError:
-                        pass
-                # Try creation date tag
-                if '\xa9day' in mp4_file:
-                    date_str = mp4_file['\xa9day'][0]
-                    try:
-                        if 'T' in date_str:
-                            return datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S')
-                        else:
-                            return datetime.strptime(date_str, '%Y-%m-%d')
-                    except ValueError:
-                        pass
+            ifd0 = _read_tiff_ifd(tiff_data, ifd0_offset, byte_order)
+            exif_ifd = {}
+            if isinstance(ifd0.get(EXIF_IFD_POINTER), int):
+                exif_ifd = _read_tiff_ifd(tiff_data, ifd0[EXIF_IFD_POINTER], byte_order)
             
-            elif file_ext == '.mov':
-                # MOV files use the same container format as MP4, so use MP4 module
-                mov_file = MP4(video_path)
-                # Try to get creation date from MOV metadata (same tags as MP4)
-                if '©day' in mov_file:
-                    date_str = mov_file['©day'][0]
-                    try:
-                        if 'T' in date_str:
-                            return datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S')
-                        else:
-                            return datetime.strptime(date_str, '%Y-%m-%d')
-                    except ValueError:
-                        pass
-                # Try creation date tag (alternative)
-                if '\xa9day' in mov_file:
-                    date_str = mov_file['\xa9day'][0]
-                    try:
-                        if 'T' in date_str:
-                            return datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S')
-                        else:
-                            return datetime.strptime(date_str, '%Y-%m-%d')
-                    except ValueError:
-                        pass
-        else:
-            # mutagen not available, will fall back to file date
-            pass
-    except Exception as e:
-            # Error reading video metadata, will fall back to file date
-            pass
-    except Exception as e:
-        pass
-    return None
+            return (exif_ifd.get(EXIF_DATETIME_ORIGINAL) or
+                    exif_ifd.get(EXIF_DATETIME_DIGITIZED) or
+                    ifd0.get(EXIF_DATETIME_ORIGINAL) or
+                    ifd0.get(EXIF_DATETIME_DIGITIZED) or
+                    ifd0.get(EXIF_DATETIME) or
+                    None)
+        position = segment_end
+    
+    raise ValueError("EXIF segment not found within the read limit")
+
+def is_jpeg_file(file_path):
+    """Check whether a file has a JPEG extension (the files parse_jpeg_exif_date() handles)."""
+    return file_path[file_path.rfind('.'):].lower() in JPEG_EXTENSIONS
 
-def get_exif_taken_date(image_path):
-    """Get EXIF date (DateTimeOriginal, CreateDate, DateTimeDigitized, or DateTime) and return as datetime object.
+def probe_file(file_path, read_head=False):
+    """Stat a file and optionally read its first JPEG_EXIF_READ_SIZE bytes with a single open.
     
-    Checks in priority order:
+    Args:
+        file_path: Path to the file
+        read_head: Also read the head of the file (only done for regular files)
+    
+    Returns:
+        Tuple (os.stat() result, head bytes or None)
+    
+    Raises:
+        OSError if the file cannot be opened
+    """
+    # O_BINARY (Windows only) keeps the head bytes from being read in text mode
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_NONBLOCK', 0) | getattr(os, 'O_BINARY', 0))
+    try:
+        file_stat = os.fstat(fd)
+        head = None
+        if read_head and stat.S_ISREG(file_stat.st_mode):
+            head = os.read(fd, JPEG_EXIF_READ_SIZE)
+    finally:
+        os.close(fd)
+    return file_stat, head
+
+def parse_exif_datetime(date_time_original):
+    """Parse an EXIF date string ('YYYY:MM:DD HH:MM:SS') into a datetime object."""
+    try:
+        return datetime.strptime(date_time_original, '%Y:%m:%d %H:%M:%S')
+    except ValueError:
+        # Try alternative format without colons in date
+        try:
+            return datetime.strptime(date_time_original.replace(':', '-', 2), '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            print(f"Error parsing EXIF date format: {date_time_original}")
+            return None
+
+def _read_exif_taken_date(image_path):
+    """Read EXIF date (DateTimeOriginal, DateTimeDigitized, or DateTime) and return as datetime object.
+    
+    Checks in priority order, returning as soon as a date is found:
     1. Nested ExifIFD DateTimeOriginal (highest priority)
     2. Nested ExifIFD DateTimeDigitized
-    3. Nested ExifIFD CreateDate
-    4. Top-level DateTimeOriginal
-    5. Top-level DateTimeDigitized
-    6. Top-level CreateDate
-    7. Top-level DateTime (lowest priority)
+    3. Top-level DateTimeOriginal
+    4. Top-level DateTimeDigitized
+    5. Top-level DateTime (lowest priority)
+    
+    JPEG files are read with parse_jpeg_exif_date() so that Pillow is never involved;
+    Pillow is used for other formats and for JPEG files the fast parser cannot handle.
     """
+    if is_jpeg_file(image_path):
+        try:
+            with open(image_path, 'rb') as f:
+                date_time_original = parse_jpeg_exif_date(f.read(JPEG_EXIF_READ_SIZE))
+        except (ValueError, struct.error, UnicodeDecodeError):
+            pass  # Unusual layout, fall back to Pillow below
+        except Exception:
+            return None
+        else:
+            return parse_exif_datetime(date_time_original) if date_time_original else None
+    
     try:
-        with Image.open(image_path) as image:
-            exif_data = None
-            
-            # Try getexif() first (newer Pillow versions)
-            try:
-                exif_data = image.getexif()
-            except AttributeError:
-                # Fallback to _getexif() for older versions
-                try:
-                    exif_data = image._getexif()
-                except AttributeError:
-                    return None
-            
+        with load_pillow().open(image_path) as image:
+            exif_data = image.getexif()
             if not exif_data:
                 return None
             
-            # Try to get date following priority order
-            date_time_original = None
-            
-            # Method 1: Try direct tag access (for getexif())
-            if hasattr(exif_data, 'get'):
-                # New getexif() returns a dict-like object
-                # PRIORITY 1-3: Check nested EXIF data FIRST (ExifIFD - tag 34665 / 0x8769)
-                try:
-                    # Tag 34665 (0x8769) is ExifIFD - contains nested EXIF tags
-                    # DateTimeOriginal is tag 0x9003 (36867) in ExifIFD
-                    if hasattr(exif_data, 'get_ifd'):
-                        # Use get_ifd() method to access nested IFD (Pillow 8.0+)
-                        try:
-                            exif_ifd = exif_data.get_ifd(0x8769)  # ExifIFD
-                            # PRIORITY 1: DateTimeOriginal is tag 0x9003 (36867) in ExifIFD
-                            date_time_original = exif_ifd.get(0x9003)  # DateTimeOriginal
-                            # PRIORITY 2: Try DateTimeDigitized (0x9004) as fallback
-                            if not date_time_original:
-                                date_time_original = exif_ifd.get(0x9004)
-                            # PRIORITY 3: Try CreateDate in nested EXIF (some cameras use this)
-                            if not date_time_original:
-                                # CreateDate might be stored as a custom tag, check by iterating
-                                for nested_tag_id in exif_ifd.keys():
-                                    nested_tag_name = TAGS.get(nested_tag_id, nested_tag_id)
-                                    if nested_tag_name == 'CreateDate' or 'CreateDate' in str(nested_tag_name):
-                                        date_time_original = exif_ifd.get(nested_tag_id)
-                                        if date_time_original:
-                                            break
-                        except Exception:
-                            pass
-                    
-                    # Alternative: Try accessing ExifIFD tag directly
-                    if not date_time_original:
-                        exif_ifd_tag = exif_data.get(34665)  # ExifIFD tag (0x8769)
-                        if exif_ifd_tag and hasattr(exif_ifd_tag, 'get'):
-                            # PRIORITY 1: DateTimeOriginal
-                            date_time_original = exif_ifd_tag.get(0x9003) or exif_ifd_tag.get(36867)
-                            # PRIORITY 2: DateTimeDigitized
-                            if not date_time_original:
-                                date_time_original = exif_ifd_tag.get(0x9004) or exif_ifd_tag.get(36868)
-                            # PRIORITY 3: CreateDate
-                            if not date_time_original and hasattr(exif_ifd_tag, 'keys'):
-                                for nested_tag_id in exif_ifd_tag.keys():
-                                    nested_tag_name = TAGS.get(nested_tag_id, nested_tag_id)
-                                    if nested_tag_name == 'CreateDate' or 'CreateDate' in str(nested_tag_name):
-                                        date_time_original = exif_ifd_tag.get(nested_tag_id)
-                                        if date_time_original:
-                                            break
-                except Exception:
-                    pass
-                
-                # PRIORITY 4-7: If not found in nested, check top-level tags in priority order
-                if not date_time_original:
-                    # PRIORITY 4: Top-level DateTimeOriginal
-                    for tag_id in exif_data.keys():
-                        tag_name = TAGS.get(tag_id, tag_id)
-                        if tag_name == 'DateTimeOriginal':
-                            date_time_original = exif_data.get(tag_id)
-                            break
-                    # PRIORITY 5: Top-level DateTimeDigitized
-                    if not date_time_original:
-                        for tag_id in exif_data.keys():
-                            tag_name = TAGS.get(tag_id, tag_id)
-                            if tag_name == 'DateTimeDigitized':
-                                date_time_original = exif_data.get(tag_id)
-                                break
-                    # PRIORITY 6: Top-level CreateDate
-                    if not date_time_original:
-                        for tag_id in exif_data.keys():
-                            tag_name = TAGS.get(tag_id, tag_id)
-                            if tag_name == 'CreateDate' or 'CreateDate' in str(tag_name):
-                                date_time_original = exif_data.get(tag_id)
-                                break
-                    # PRIORITY 7: Top-level DateTime (lowest priority)
-                    if not date_time_original:
-                        for tag_id in exif_data.keys():
-                            tag_name = TAGS.get(tag_id, tag_id)
-                            if tag_name == 'DateTime':
-                                date_time_original = exif_data.get(tag_id)
-                                break
-            else:
-                # Method 2: Old _getexif() returns a dict - iterate through items
-                # Note: Old _getexif() doesn't support nested ExifIFD easily, so we check top-level only
-                # But we still follow priority order: DateTimeOriginal > DateTimeDigitized > CreateDate > DateTime
-                for tag_id, value in exif_data.items():
-                    tag = TAGS.get(tag_id, tag_id)
-                    if tag == 'DateTimeOriginal':
-                        date_time_original = value
-                        break
-                # If not found, try DateTimeDigitized
-                if not date_time_original:
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        if tag == 'DateTimeDigitized':
-                            date_time_original = value
-                            break
-                # If not found, try CreateDate
-                if not date_time_original:
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        if tag == 'CreateDate' or 'CreateDate' in str(tag):
-                            date_time_original = value
-                            break
-                # If not found, try DateTime (lowest priority)
-                if not date_time_original:
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        if tag == 'DateTime':
-                            date_time_original = value
-                            break
-            
+            # Nested ExifIFD first: DateTimeOriginal is by far the most common hit
+            exif_ifd = exif_data.get_ifd(EXIF_IFD_POINTER)
+            date_time_original = exif_ifd.get(EXIF_DATETIME_ORIGINAL)
             if date_time_original:
-                # Format: 'YYYY:MM:DD HH:MM:SS'
-                try:
-                    return datetime.strptime(date_time_original, '%Y:%m:%d %H:%M:%S')
-                except ValueError:
-                    # Try alternative format without colons in date
-                    try:
-                        return datetime.strptime(date_time_original.replace(':', '-', 2), '%Y-%m-%d %H:%M:%S')
-                    except ValueError:
-                        print(f"Error parsing EXIF date format: {date_time_original}")
-                        return None
+                return parse_exif_datetime(date_time_original)
+            
+            date_time_original = (exif_ifd.get(EXIF_DATETIME_DIGITIZED) or
+                                  exif_data.get(EXIF_DATETIME_ORIGINAL) or
+                                  exif_data.get(EXIF_DATETIME_DIGITIZED) or
+                                  exif_data.get(EXIF_DATETIME))
+            # Format: 'YYYY:MM:DD HH:MM:SS'
+            return parse_exif_datetime(date_time_original) if date_time_original else None
     except Exception:
         # Not an image file or error reading EXIF
         pass
     return None
 
-def get_file_date(file_path):
-    """Get the older of creation or modification date from file metadata and return as datetime object."""
+# Dates are cached per (path, mtime_ns, size), so repeated events for an unchanged
+# file skip parsing, while edited or replaced files are parsed again
+DATE_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _cached_video_taken_date(video_path, mtime_ns, size):
+    return _read_video_taken_date(video_path)
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _cached_exif_taken_date(image_path, mtime_ns, size):
+    return _read_exif_taken_date(image_path)
+
+def get_video_taken_date(video_path, file_stat=None):
+    """Get creation date from video file metadata (cached) and return as datetime object.
+    
+    Args:
+        video_path: Path to the video file
+        file_stat: os.stat() result for the file if already available
+    """
+    try:
+        if file_stat is None:
+            file_stat = os.stat(video_path)
+    except OSError:
+        return None
+    return _cached_video_taken_date(video_path, file_stat.st_mtime_ns, file_stat.st_size)
+
+def get_exif_taken_date(image_path, file_stat=None, head=None):
+    """Get EXIF date (cached) and return as datetime object - see _read_exif_taken_date().
+    
+    Args:
+        image_path: Path to the image file
+        file_stat: os.stat() result for the file if already available
+        head: First bytes of a JPEG file if already read (see probe_file()), parsed without opening the file again
+    """
+    if head is not None and is_jpeg_file(image_path):
+        try:
+            date_time_original = parse_jpeg_exif_date(head)
+        except (ValueError, struct.error, UnicodeDecodeError):
+            pass  # Unusual layout, let the cached reader fall back to Pillow
+        else:
+            return parse_exif_datetime(date_time_original) if date_time_original else None
+    try:
+        if file_stat is None:
+            file_stat = os.stat(image_path)
+    except OSError:
+        return None
+    return _cached_exif_taken_date(image_path, file_stat.st_mtime_ns, file_stat.st_size)
+
+def get_file_date(file_path, file_stat=None):
+    """Get the older of creation or modification date from file metadata and return as datetime object.
+    
+    Args:
+        file_path: Path to the file
+        file_stat: os.stat() result for the file if already available (avoids another stat call)
+    """
     try:
-        creation_time = os.path.getctime(file_path)
-        modification_time = os.path.getmtime(file_path)
+        if file_stat is None:
+            file_stat = os.stat(file_path)
         # Use the older (earlier) date
-        oldest_timestamp = min(creation_time, modification_time)
+        oldest_timestamp = min(file_stat.st_ctime, file_stat.st_mtime)
         return datetime.fromtimestamp(oldest_timestamp)
     except Exception as e:
         print(f"Error reading file date from {file_path}: {e}")
         return None
 
-def get_file_modification_time(file_path):
-    """Get the modification time of a file as datetime object."""
+def get_file_modification_time(file_path, file_stat=None):
+    """Get the modification time of a file as datetime object (from file_stat if given)."""
     try:
-        modification_time = os.path.getmtime(file_path)
-        return datetime.fromtimestamp(modification_time)
+        if file_stat is None:
+            file_stat = os.stat(file_path)
+        return datetime.fromtimestamp(file_stat.st_mtime)
     except Exception as e:
         print(f"Error reading modification time from {file_path}: {e}")
         return None
@@ -891,7 +1532,8 @@ def format_datetime_for_filename(dt, include_subseconds=False):
     Returns:
         Formatted string: yyyymmdd_hhmmss or yyyymmdd_hhmmss.XXXX
     """
-    base_format = dt.strftime('%Y%m%d_%H%M%S')
+    # f-string formatting of the integer fields is faster than strftime()
+    base_format = f"{dt.year:04d}{dt.month:02d}{dt.day:02d}_{dt.hour:02d}{dt.minute:02d}{dt.second:02d}"
     # Only include subseconds if requested and available
     if include_subseconds and dt.microsecond > 0:
         # Convert microseconds to a 4-digit value (divide by 100 to get 0-9999 range)
@@ -901,53 +1543,368 @@ def format_datetime_for_filename(dt, include_subseconds=False):
         return f"{base_format}.{milliseconds_value:04d}"
     return base_format
 
-def calculate_md5(file_path):
-    """Calculate MD5 hash of a file."""
-    hash_md5 = hashlib.md5()
+@functools.lru_cache(maxsize=4096)
+def date_folder_parts(year, month):
+    """Return the (yyyy, mm_MMM) destination folder names for a year and month (cached).
+    
+    Example: (2024, 8) -> ('2024', '08_Aug')
+    """
+    return f"{year:04d}", f"{month:02d}_{datetime(year, month, 1).strftime('%b')}"
+
+@functools.lru_cache(maxsize=4096)
+def date_dest_folder(dest_dir, year, month):
+    """Return the destination folder path for a year and month below dest_dir (cached).
+    
+    Example: ('/volume1/photo/', 2024, 8) -> '/volume1/photo/2024/08_Aug'
+    """
+    return os.path.join(dest_dir, *date_folder_parts(year, month))
+
+# Read size used when hashing file contents (1 MiB keeps Python loop overhead low)
+HASH_CHUNK_SIZE = 1 << 20
+
+def new_content_hasher(threaded=False):
+    """Create the hash object used for duplicate detection.
+    
+    Prefers BLAKE3, then xxHash (xxh3_128), and falls back to MD5. Hashes are only
+    compared within a single run, so the algorithm may differ between installs.
+    
+    Args:
+        threaded: Let BLAKE3 hash large inputs on multiple threads
+    """
+    if BLAKE3_AVAILABLE:
+        return blake3(max_threads=blake3.AUTO) if threaded else blake3()
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128()
+    import hashlib
+    return hashlib.md5()
+
+# Whole-file hashes are cached per (path, mtime_ns, size, inode, ctime_ns), so files kept
+# in the Duplicates folder are hashed once instead of on every duplicate check. A rename
+# keeps the mtime, so the inode and ctime tell a file moved onto an existing path apart
+# from the file that was there before
+HASH_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=HASH_CACHE_SIZE)
+def _cached_file_digest(file_path, mtime_ns, size, ino, ctime_ns):
+    # Files are read rather than memory-mapped: a file truncated by another client
+    # while mapped would kill the process with SIGBUS instead of raising OSError
+    with open(file_path, "rb", buffering=0) as f:
+        import hashlib
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, lambda: new_content_hasher(threaded=True)).hexdigest()
+        hasher = new_content_hasher(threaded=True)
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+def file_digest(file_path, file_stat=None):
+    """Calculate the content hash of a file for duplicate detection (cached).
+    
+    Files are read with hashlib.file_digest() on Python 3.11+ (a read loop with
+    its own 256 KiB buffer); older versions use an unbuffered read loop with
+    HASH_CHUNK_SIZE chunks.
+    
+    Args:
+        file_path: Path to the file
+        file_stat: os.stat() result for the file if already available
+    """
+    try:
+        if file_stat is None:
+            file_stat = os.stat(file_path)
+        return _cached_file_digest(file_path, file_stat.st_mtime_ns, file_stat.st_size,
+                                   file_stat.st_ino, file_stat.st_ctime_ns)
+    except Exception as e:
+        print(f"Error calculating hash for {file_path}: {e}")
+        return None
+
+# Bytes sampled from the head and tail of a file for fast_fingerprint()
+FINGERPRINT_SAMPLE_SIZE = 65536
+# Fingerprints are cached per (path, mtime_ns, size, inode, ctime_ns) like whole-file
+# hashes, so a source file compared against several candidates is only sampled once
+FINGERPRINT_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)
+def _cached_fingerprint(file_path, mtime_ns, size, ino, ctime_ns, sample_size):
+    hasher = new_content_hasher()
+    with open(file_path, "rb") as f:
+        hasher.update(f.read(sample_size))
+        if size > 2 * sample_size:
+            f.seek(-sample_size, os.SEEK_END)
+            hasher.update(f.read(sample_size))
+    hasher.update(size.to_bytes(8, 'little'))
+    return hasher.hexdigest()
+
+def fast_fingerprint(file_path, file_stat=None, sample_size=FINGERPRINT_SAMPLE_SIZE):
+    """Calculate a cheap fingerprint from the file size and its first and last bytes.
+    
+    Files with different fingerprints always differ. Equal fingerprints do not prove
+    the files are identical, so a full file_digest() comparison is still required.
+    
+    Args:
+        file_path: Path to the file
+        file_stat: os.stat() result for the file if already available
+        sample_size: Bytes hashed from each end of the file
+    """
     try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        if file_stat is None:
+            file_stat = os.stat(file_path)
+        return _cached_fingerprint(file_path, file_stat.st_mtime_ns, file_stat.st_size,
+                                   file_stat.st_ino, file_stat.st_ctime_ns, sample_size)
     except Exception as e:
-        print(f"Error calculating MD5 for {file_path}: {e}")
+        print(f"Error calculating fingerprint for {file_path}: {e}")
+        return None
+
+class FileInfo:
+    """A file's path and stat result, with fingerprint and content hash computed on first use.
+    
+    Passing one FileInfo through the duplicate checks means each file is stat'ed
+    once and hashed at most once, however many comparisons it takes part in.
+    """
+    __slots__ = ('path', 'stat', '_fingerprint', '_digest')
+    
+    def __init__(self, path, file_stat=None):
+        self.path = path
+        self.stat = file_stat if file_stat is not None else os.stat(path)
+        self._fingerprint = None
+        self._digest = None
+    
+    @property
+    def size(self):
+        return self.stat.st_size
+    
+    @property
+    def mtime_ns(self):
+        return self.stat.st_mtime_ns
+    
+    @property
+    def fingerprint(self):
+        """fast_fingerprint() of the file (None if it cannot be read)."""
+        if self._fingerprint is None:
+            self._fingerprint = fast_fingerprint(self.path, self.stat)
+        return self._fingerprint
+    
+    @property
+    def digest(self):
+        """file_digest() of the file (None if it cannot be read)."""
+        if self._digest is None:
+            self._digest = file_digest(self.path, self.stat)
+        return self._digest
+
+def files_have_same_content(file_info, other_info):
+    """Check if two files (FileInfo objects) have identical content.
+    
+    Files of different sizes are rejected without reading them. When FAST_DEDUP is
+    enabled, files whose fingerprints differ are rejected without reading them in
+    full; whole-file hashes are only compared on a match.
+    """
+    if file_info.size != other_info.size:
+        return False
+    if FAST_DEDUP:
+        if file_info.fingerprint is None or file_info.fingerprint != other_info.fingerprint:
+            return False
+    return file_info.digest is not None and file_info.digest == other_info.digest
+
+# Folder index used by check_duplicate():
+# folder path -> (folder st_mtime_ns, {file size: [FileInfo, ...]})
+# An index is rebuilt when the folder's mtime shows files were added or removed by
+# someone else; moves made by this script update it in place (see index_added_file)
+_folder_index = {}
+
+def _get_folder_index(folder_path):
+    """Return the {size: [FileInfo, ...]} index of a folder, or None if it is not a directory."""
+    try:
+        folder_stat = cached_stat(folder_path)
+    except OSError:
         return None
+    cached = _folder_index.get(folder_path)
+    if cached is not None and cached[0] == folder_stat.st_mtime_ns:
+        return cached[1]
+    
+    files_by_size = {}
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    entry_stat = entry.stat()
+                    files_by_size.setdefault(entry_stat.st_size, []).append(FileInfo(entry.path, entry_stat))
+            except OSError:
+                pass  # File was removed while scanning
+    _folder_index[folder_path] = (folder_stat.st_mtime_ns, files_by_size)
+    return files_by_size
 
-def check_duplicate_md5_in_folder(file_path, folder_path):
-    """Check if a file with the same MD5 hash already exists in the specified folder.
+def index_added_file(folder_path, file_path):
+    """Add a file this script just moved into folder_path to the folder index and name cache."""
+    cached = _folder_index.get(folder_path)
+    cached_names = _folder_names.get(folder_path)
+    if cached is None and cached_names is None:
+        return
+    try:
+        file_stat = os.stat(file_path)
+        folder_stat = cached_stat(folder_path)
+    except OSError:
+        _folder_index.pop(folder_path, None)
+        _folder_names.pop(folder_path, None)
+        return
+    if cached is not None:
+        files_by_size = cached[1]
+        files_by_size.setdefault(file_stat.st_size, []).append(FileInfo(file_path, file_stat))
+        _folder_index[folder_path] = (folder_stat.st_mtime_ns, files_by_size)
+    if cached_names is not None:
+        names = cached_names[1]
+        names.add(os.path.basename(file_path))
+        _folder_names[folder_path] = (folder_stat.st_mtime_ns, names)
+
+def check_duplicate(file_info, folder_path):
+    """Check if a file with the same content already exists in the specified folder.
+    
+    The folder is listed once and indexed by file size; only same-sized files are
+    compared, and their hashes are cached, so repeated checks against a large
+    Duplicates folder do not re-read it.
     
     Args:
-        file_path: Path to the file to check
+        file_info: FileInfo of the file to check (its hash is reused if already known)
         folder_path: Path to the folder to search in
         
     Returns:
         Path to the existing duplicate file if found, None otherwise
     """
-    if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
+    try:
+        files_by_size = _get_folder_index(folder_path)
+    except Exception as e:
+        print(f"Error checking for duplicate hash in {folder_path}: {e}")
         return None
-    
-    source_hash = calculate_md5(file_path)
-    if source_hash is None:
+    if not files_by_size:
         return None
     
-    # Check all files in the folder
-    try:
-        for filename in os.listdir(folder_path):
-            existing_file_path = os.path.join(folder_path, filename)
-            if os.path.isfile(existing_file_path):
-                existing_hash = calculate_md5(existing_file_path)
-                if existing_hash == source_hash:
-                    return existing_file_path
-    except Exception as e:
-        print(f"Error checking for duplicate MD5 in {folder_path}: {e}")
+    for existing_info in files_by_size.get(file_info.size, ()):
+        if existing_info.path != file_info.path and files_have_same_content(file_info, existing_info):
+            return existing_info.path
     
     return None
 
+# Number of leading hash characters used as the Duplicates shard folder name
+DUPLICATES_SHARD_LENGTH = 2
+# Marker file in the Duplicates folder recording the hash algorithm used for sharding
+DUPLICATES_SHARD_MARKER = '.shard_hash'
+
+def get_duplicates_folder(file_info=None):
+    """Return the Duplicates folder for a file.
+    
+    This is DEST_DIR/Duplicates, or DEST_DIR/Duplicates/<first hash characters> when
+    SHARD_DUPLICATES is enabled, which keeps every folder small. Files whose hash
+    cannot be calculated stay in the top-level folder.
+    """
+    duplicates_root = os.path.join(DEST_DIR, 'Duplicates')
+    if SHARD_DUPLICATES and file_info is not None:
+        digest = file_info.digest
+        if digest:
+            return os.path.join(duplicates_root, digest[:DUPLICATES_SHARD_LENGTH])
+    return duplicates_root
+
+def _is_shard_folder_name(name):
+    return len(name) == DUPLICATES_SHARD_LENGTH and all(c in '0123456789abcdef' for c in name)
+
+def migrate_duplicates_to_shards():
+    """Move files in the Duplicates folder into their shard folders (SHARD_DUPLICATES only).
+    
+    Files in the top-level Duplicates folder are always moved. Shard folders are
+    rebuilt as well when the hash algorithm changed since they were created (for
+    example after blake3 or xxhash was installed), as recorded in DUPLICATES_SHARD_MARKER.
+    """
+    if not SHARD_DUPLICATES:
+        return
+    duplicates_root = os.path.join(DEST_DIR, 'Duplicates')
+    if not os.path.isdir(duplicates_root):
+        return
+    
+    marker_path = os.path.join(duplicates_root, DUPLICATES_SHARD_MARKER)
+    hash_name = new_content_hasher().name
+    try:
+        with open(marker_path, 'r', encoding='utf-8') as f:
+            rehash_shards = f.read().strip() != hash_name
+    except FileNotFoundError:
+        rehash_shards = True
+    except OSError:
+        rehash_shards = False
+    
+    folders = [duplicates_root]
+    if rehash_shards:
+        with os.scandir(duplicates_root) as entries:
+            folders += [entry.path for entry in entries if entry.is_dir() and _is_shard_folder_name(entry.name)]
+    
+    moved = 0
+    for folder in folders:
+        with os.scandir(folder) as entries:
+            files = [(entry.path, entry.name) for entry in entries
+                     if entry.is_file() and entry.name != DUPLICATES_SHARD_MARKER]
+        for file_path, name in files:
+            try:
+                target_folder = get_duplicates_folder(FileInfo(file_path))
+                if target_folder == folder:
+                    continue
+                ensure_dir(target_folder)
+                if name in _list_file_names(target_folder) or os.path.lexists(os.path.join(target_folder, name)):
+                    name = get_unique_duplicate_filename(target_folder, name)
+                target_path = os.path.join(target_folder, name)
+                move_into_dir(file_path, target_path)
+                index_added_file(target_folder, target_path)
+                update_synology_indexer(old_path=file_path, new_path=target_path)
+                moved += 1
+            except Exception as e:
+                log_system_event("Warning", f"Could not move {file_path} to its Duplicates shard folder: {e}")
+        if folder != duplicates_root:
+            try:
+                os.rmdir(folder)  # Only succeeds if the old shard folder is now empty
+                _known_dirs.discard(folder)
+            except OSError:
+                pass
+    
+    try:
+        with open(marker_path, 'w', encoding='utf-8') as f:
+            f.write(hash_name)
+    except OSError as e:
+        log_system_event("Warning", f"Could not write {marker_path}: {e}")
+    if moved:
+        log_system_event("Info", f"Moved {moved} files in the Duplicates folder into shard folders")
+
+# Date-based duplicate file name: yyyymmdd_hhmmss with an optional .XXXX counter
+_DUP_NAME_RE = re.compile(r'(\d{8}_\d{6})(?:\.\d{4})?(.*)')
+
+# Entry names per folder for get_unique_duplicate_filename():
+# folder path -> (folder st_mtime_ns, set of names), kept current like _folder_index
+_folder_names = {}
+
+def _list_file_names(folder_path):
+    """Return the set of entry names in a folder (empty if the folder cannot be read).
+    
+    The listing is cached until the folder's mtime changes; files moved into the
+    folder by this script are added with index_added_file().
+    """
+    try:
+        folder_mtime_ns = cached_stat(folder_path).st_mtime_ns
+        cached = _folder_names.get(folder_path)
+        if cached is not None and cached[0] == folder_mtime_ns:
+            return cached[1]
+        with os.scandir(folder_path) as entries:
+            names = {entry.name for entry in entries}
+    except OSError:
+        return set()
+    _folder_names[folder_path] = (folder_mtime_ns, names)
+    return names
+
+def _first_free_numbered_name(taken_names, stem, ext):
+    """Return stem.0001ext, stem.0002ext, ... - the first one not in taken_names."""
+    counter = 1
+    while f"{stem}.{counter:04d}{ext}" in taken_names:
+        counter += 1
+    return f"{stem}.{counter:04d}{ext}"
+
 def get_unique_duplicate_filename(duplicates_folder, base_filename, media_datetime=None):
     """Get a unique filename in the Duplicates folder with subseconds format.
     
     Format: yyyymmdd_hhmmss.ssss.ext
     If subseconds are not available, use sequential numbers: yyyymmdd_hhmmss.0001.ext, etc.
+    The returned name is checked to be free on disk, so it is safe to move to.
     
     Args:
         duplicates_folder: Path to duplicates folder
@@ -960,6 +1917,24 @@ def get_unique_duplicate_filename(duplicates_folder, base_filename, media_dateti
     # Extract base name and extension
     name, ext = os.path.splitext(base_filename)
     
+    # One directory listing instead of an os.path.exists() probe per candidate name
+    taken_names = _list_file_names(duplicates_folder)
+    unique_name = _pick_duplicate_filename(taken_names, name, ext, media_datetime)
+    
+    # The cached listing can miss files other clients added within STAT_CACHE_TTL, and
+    # fast_move() overwrites without warning, so the chosen name is checked on disk; if
+    # it is taken, the listing is read again
+    found_taken = set()
+    while os.path.lexists(os.path.join(duplicates_folder, unique_name)):
+        found_taken.add(unique_name)
+        invalidate_stat(duplicates_folder)
+        _folder_names.pop(duplicates_folder, None)
+        taken_names = _list_file_names(duplicates_folder) | found_taken
+        unique_name = _pick_duplicate_filename(taken_names, name, ext, media_datetime)
+    return unique_name
+
+def _pick_duplicate_filename(taken_names, name, ext, media_datetime):
+    """Return the first Duplicates file name not in taken_names (see get_unique_duplicate_filename)."""
     # If we have datetime, try to use subseconds format
     if media_datetime:
         base_format = format_datetime_for_filename(media_datetime, include_subseconds=False)
@@ -967,151 +1942,329 @@ def get_unique_duplicate_filename(duplicates_folder, base_filename, media_dateti
         if media_datetime.microsecond > 0:
             subseconds_format = format_datetime_for_filename(media_datetime, include_subseconds=True)
             test_filename = f"{subseconds_format}{ext}"
-            test_path = os.path.join(duplicates_folder, test_filename)
-            if not os.path.exists(test_path):
+            if test_filename not in taken_names:
                 return test_filename
         
         # If no subseconds or file exists, use base format with sequential numbers
-        counter = 1
-        while True:
-            test_filename = f"{base_format}.{counter:04d}{ext}"
-            test_path = os.path.join(duplicates_folder, test_filename)
-            if not os.path.exists(test_path):
-                return test_filename
-            counter += 1
+        return _first_free_numbered_name(taken_names, base_format, ext)
+    
+    # No datetime available, try to extract date from filename if it matches pattern
+    # Pattern: yyyymmdd_hhmmss.ext or yyyymmdd_hhmmss.XXXX.ext
+    match = _DUP_NAME_RE.match(name)
+    if match:
+        return _first_free_numbered_name(taken_names, match.group(1), ext)
+    # Fallback: use original name with sequential numbers
+    return _first_free_numbered_name(taken_names, name, ext)
+
+def get_media_datetime(file_path, file_stat=None, head=None):
+    """Get the date used to organize a media file.
+    
+    Uses video metadata or EXIF data first and falls back to the file date.
+    An already available os.stat() result can be passed as file_stat, and the
+    head bytes read by probe_file() as head.
+    
+    Returns:
+        datetime object, or None for unknown file types or if no date is available
+    """
+    media_type = classify_file(file_path)
+    if media_type == 'video':
+        media_datetime = get_video_taken_date(file_path, file_stat)
+    elif media_type == 'image':
+        media_datetime = get_exif_taken_date(file_path, file_stat, head)
     else:
-        # No datetime available, try to extract date from filename if it matches pattern
-        # Pattern: yyyymmdd_hhmmss.ext or yyyymmdd_hhmmss.XXXX.ext
-        import re
-        # Try to match yyyymmdd_hhmmss pattern (with or without subseconds)
-        match = re.match(r'(\d{8}_\d{6})(?:\.\d{4})?(.*)', name)
-        if match:
-            base_date = match.group(1)
-            counter = 1
-            while True:
-                test_filename = f"{base_date}.{counter:04d}{ext}"
-                test_path = os.path.join(duplicates_folder, test_filename)
-                if not os.path.exists(test_path):
-                    return test_filename
-                counter += 1
-        else:
-            # Fallback: use original name with sequential numbers
-            counter = 1
-            while True:
-                test_filename = f"{name}.{counter:04d}{ext}"
-                test_path = os.path.join(duplicates_folder, test_filename)
-                if not os.path.exists(test_path):
-                    return test_filename
-                counter += 1
+        return None
+    return media_datetime or get_file_date(file_path, file_stat)
+
+# A file is considered completely written once its mtime is this old (seconds),
+# or once its mtime stops changing between polls
+FILE_SETTLE_AGE = 2.0
+FILE_SETTLE_POLL_INTERVAL = 0.25
+# Seconds a worker waits for a file that keeps changing (a slow or stalled upload)
+# before leaving it to the rescan, which retries it after PENDING_FILE_BACKOFF
+FILE_SETTLE_MAX_WAIT = 30.0
+
+def wait_for_file_to_settle(file_path, file_stat):
+    """Wait until a file is no longer being written.
+    
+    Files older than FILE_SETTLE_AGE return immediately; recently modified files are
+    polled until their mtime and size stop changing, for at most FILE_SETTLE_MAX_WAIT
+    seconds. A file still changing after that is marked pending (see mark_file_pending).
+    
+    Args:
+        file_path: Path to the file
+        file_stat: os.stat() result for the file
+    
+    Returns:
+        The latest os.stat() result, or None if the file disappeared or is still changing
+    """
+    if time.time() - file_stat.st_mtime > FILE_SETTLE_AGE:
+        return file_stat
+    deadline = time.monotonic() + FILE_SETTLE_MAX_WAIT
+    while True:
+        if time.monotonic() >= deadline:
+            print(f"{file_path} is still being written, will retry later")
+            mark_file_pending(file_path, time.time())
+            return None
+        time.sleep(FILE_SETTLE_POLL_INTERVAL)
+        try:
+            new_stat = os.stat(file_path)
+        except OSError:
+            return None
+        if new_stat.st_mtime_ns == file_stat.st_mtime_ns and new_stat.st_size == file_stat.st_size:
+            return new_stat
+        file_stat = new_stat
+
+# Files the rescan found still being written: path -> time of that rescan (oldest first).
+# They are checked again after PENDING_FILE_BACKOFF seconds instead of on every rescan.
+PENDING_FILE_BACKOFF = 20.0
+PENDING_FILES_MAX = 1024
+_pending_files = collections.OrderedDict()
+_pending_files_lock = threading.Lock()
+
+def mark_file_pending(file_path, now):
+    """Remember that a file was skipped because it is still being written."""
+    with _pending_files_lock:
+        _pending_files[file_path] = now
+        _pending_files.move_to_end(file_path)
+        while len(_pending_files) > PENDING_FILES_MAX:
+            _pending_files.popitem(last=False)
+
+def pending_file_due(file_path, now):
+    """Check whether a file should be examined, i.e. it was not skipped within PENDING_FILE_BACKOFF."""
+    with _pending_files_lock:
+        skipped_at = _pending_files.get(file_path)
+    return skipped_at is None or now - skipped_at >= PENDING_FILE_BACKOFF
 
-def process_photo(file_path):
-    """Process a single photo or video file and move it to the appropriate date folder."""
-    global bytes_moved, bytes_deleted, last_file_detected_time, statistics_reset_time
+# How often a file is compared with its destination again when either file changed
+# before the move could be made
+ORGANIZE_ATTEMPTS = 3
+
+def process_photo(file_path, file_closed=False):
+    """Process a single photo or video file and move it to the appropriate date folder.
+    
+    Args:
+        file_path: Path to the file in the source directory
+        file_closed: The file was reported by a close-after-write event, so it is complete
+    """
+    global last_file_detected_time, statistics_reset_time
     
     # Skip Windows Zone.Identifier files
     if file_path.endswith('.Zone.Identifier'):
         return
     
-    # Verify file exists before processing
-    if not os.path.isfile(file_path):
+    # The file is being handled now, so the rescan no longer needs to hold it back
+    with _pending_files_lock:
+        _pending_files.pop(file_path, None)
+    
+    # Verify file exists before processing; JPEG files have their EXIF header read in the
+    # same open, so the stat result and head bytes are reused below
+    try:
+        file_stat, head = probe_file(file_path, read_head=is_jpeg_file(file_path))
+    except OSError:
+        return
+    if not stat.S_ISREG(file_stat.st_mode):
         return
     
     # Verify file is still in the source directory (hasn't been moved already)
     # This prevents processing files that have already been moved by a previous process_photo() call
     try:
-        # Get absolute paths for comparison
-        abs_file_path = os.path.abspath(file_path)
-        abs_source_dir = os.path.abspath(SOURCE_DIR)
-        
-        # Check if file is within the source directory
-        if not abs_file_path.startswith(abs_source_dir + os.sep) and abs_file_path != abs_source_dir:
+        if not is_in_source_dir(file_path):
             # File is not in source directory, skip processing
             return
     except Exception:
         # If path comparison fails, continue (better to try than skip)
         pass
     
-    # Double-check file still exists (race condition protection)
-    if not os.path.isfile(file_path):
-        return
-    
-    # Update last file detected time
-    last_file_detected_time = time.time()
+    # Update last file detected time (coarse clock: no clock call per file)
+    last_file_detected_time = coarse_now
     
     # Clear the reset flag when new activity is detected (statistics were already logged on reset)
     if statistics_reset_time is not None:
         statistics_reset_time = None
     
-    # Wait a moment to ensure file is fully written (useful for large files being copied)
-    time.sleep(0.5)
+    # Make sure a recently written file is complete (useful for large files being copied)
+    if not file_closed:
+        settled_stat = wait_for_file_to_settle(file_path, file_stat)
+        if settled_stat is None:
+            return  # File was moved or deleted while waiting, or is still being written
+        if settled_stat is not file_stat:
+            head = None  # Head bytes were read before the file was complete
+        file_stat = settled_stat
+    
+    # Try to get date from metadata, falling back to file metadata
+    media_datetime = get_media_datetime(file_path, file_stat, head)
+    
+    # Files are hashed without holding _file_operation_lock, so several workers can read
+    # at once; destination checks, moves and statistics updates are done one file at a time
+    for _ in range(ORGANIZE_ATTEMPTS):
+        compared = compare_with_destination(file_path, file_stat, media_datetime)
+        with _file_operation_lock:
+            if _organize_file(file_path, file_stat, media_datetime, compared):
+                return
+        # The file or its destination changed since they were compared: compare again
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return
+    log_system_event("Warning", f"{file_path} or its destination kept changing while being compared, will retry on the next scan")
+
+def _destination_of(file_path, media_type, media_datetime):
+    """Return the destination folder and file name of a file (see _organize_file)."""
+    original_filename = os.path.basename(file_path)
+    if media_type is None:
+        # Neither image nor video
+        return os.path.join(DEST_DIR, 'Unknown File Types'), original_filename
+    if media_datetime:
+        # We have a date, rename file to yyyymmdd_hhmmss.* (without subseconds for destination folder)
+        file_ext = os.path.splitext(original_filename)[1]  # Get extension including dot
+        new_filename = format_datetime_for_filename(media_datetime, include_subseconds=False) + file_ext
+        # Folder DEST_DIR/yyyy/mm_MMM (e.g., 2024/08_Aug)
+        return date_dest_folder(DEST_DIR, media_datetime.year, media_datetime.month), new_filename
+    # No date found, keep original filename and move to NoDateFound
+    return os.path.join(DEST_DIR, 'NoDateFound'), original_filename
+
+def _choose_file_to_replace(source_info, dest_info):
+    """Choose which of two different files with the same destination goes to Duplicates.
+    
+    Returns:
+        (FileInfo of the file to move, description for the log)
+    """
+    source_mod_time = get_file_modification_time(source_info.path, source_info.stat)
+    dest_mod_time = get_file_modification_time(dest_info.path, dest_info.stat)
+    
+    if source_mod_time and dest_mod_time:
+        # Determine which file is newer (modified)
+        if source_mod_time > dest_mod_time:
+            # Source file is newer, move it to Duplicates
+            return source_info, f"Newer file (modified: {source_mod_time.strftime('%Y-%m-%d %H:%M:%S')})"
+        # Destination file is newer, move it to Duplicates and keep source
+        return dest_info, f"Older file (modified: {dest_mod_time.strftime('%Y-%m-%d %H:%M:%S')})"
+    # Fallback if we can't get modification times
+    return source_info, "Unable to get modification times"
+
+def _same_file_version(stat_a, stat_b):
+    """Check whether two os.stat() results describe the same, unchanged file."""
+    return (stat_a.st_ino == stat_b.st_ino and stat_a.st_size == stat_b.st_size
+            and stat_a.st_mtime_ns == stat_b.st_mtime_ns and stat_a.st_ctime_ns == stat_b.st_ctime_ns)
+
+def compare_with_destination(file_path, file_stat, media_datetime):
+    """Hash what _organize_file() will compare, without holding _file_operation_lock.
+    
+    If a file already exists at the destination, both files are read as far as
+    files_have_same_content() needs. When they differ, the file that will go to
+    Duplicates is also compared with the same-sized files there, so that
+    _organize_file() only finds cached hashes.
     
-    # Final check after sleep - file might have been moved during sleep
-    if not os.path.isfile(file_path):
-        return
+    Args:
+        file_path: Path to the file in the source directory
+        file_stat: os.stat() result for the file
+        media_datetime: Date the file is organized by (see get_media_datetime)
     
+    Returns:
+        (source FileInfo, destination FileInfo), or None if there is no destination file
+    """
+    media_type = classify_file(file_path)
+    dest_folder, dest_filename = _destination_of(file_path, media_type, media_datetime)
+    # Usually there is no file at the destination, which costs a single failing stat()
+    try:
+        dest_info = FileInfo(f"{dest_folder}{os.sep}{dest_filename}")
+    except OSError:
+        return None
+    source_info = FileInfo(file_path, file_stat)
+    
+    if not files_have_same_content(source_info, dest_info) and media_type is not None:
+        file_to_move_info = _choose_file_to_replace(source_info, dest_info)[0]
+        duplicates_folder = get_duplicates_folder(file_to_move_info)
+        # The folder index is shared, so only the candidate list is taken under the lock
+        with _file_operation_lock:
+            try:
+                files_by_size = _get_folder_index(duplicates_folder)
+            except OSError:
+                files_by_size = None
+            candidates = list(files_by_size.get(file_to_move_info.size, ())) if files_by_size else []
+        for existing_info in candidates:
+            if existing_info.path != file_to_move_info.path and files_have_same_content(file_to_move_info, existing_info):
+                break
+    return source_info, dest_info
+
+def _organize_file(file_path, file_stat, media_datetime, compared):
+    """Move a file from the source directory to its destination (see process_photo).
+    
+    Must be called with _file_operation_lock held. compared is the result of
+    compare_with_destination(); its hashes are reused if neither file changed since.
+    
+    Returns:
+        False if the file must be compared with its destination again, True otherwise
+    """
     original_filename = os.path.basename(file_path)
-    file_ext = os.path.splitext(original_filename)[1]  # Get extension including dot
     
     # Determine if this is a video or image file
-    is_video = is_video_file(file_path)
-    is_image = is_image_file(file_path)
+    media_type = classify_file(file_path)
+    dest_folder, dest_filename = _destination_of(file_path, media_type, media_datetime)
+    ensure_dir(dest_folder)
+    # dest_folder never ends with a separator, so plain concatenation matches os.path.join()
+    dest_path = f"{dest_folder}{os.sep}{dest_filename}"
+    
+    # Check if destination file already exists (the stat result is reused below); its
+    # contents were compared before the lock was taken, unless either file changed since
+    try:
+        dest_stat = os.stat(dest_path)
+    except OSError:
+        dest_stat = None
+    if dest_stat is not None:
+        # Another worker may have handled the same file while this one was waiting
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return True
+        if (compared is None or not _same_file_version(compared[0].stat, file_stat)
+                or not _same_file_version(compared[1].stat, dest_stat)):
+            return False
+        source_info, dest_info = compared
     
     # If file is neither image nor video, move to Unknown File Types folder
-    if not is_video and not is_image:
-        unknown_folder = os.path.join(DEST_DIR, 'Unknown File Types')
-        ensure_dir(unknown_folder)
-        dest_path = os.path.join(unknown_folder, original_filename)
+    if media_type is None:
+        unknown_folder = dest_folder
         
         # Check if file already exists in Unknown File Types folder
-        if os.path.exists(dest_path):
-            # Compare MD5 hashes to determine if it's a duplicate
+        if dest_stat is not None:
+            # Compare content hashes to determine if it's a duplicate
             try:
-                source_size = os.path.getsize(file_path)
-                dest_size = os.path.getsize(dest_path)
-                if source_size == dest_size:
-                    source_hash = calculate_md5(file_path)
-                    if source_hash is not None:
-                        dest_hash = calculate_md5(dest_path)
-                        if source_hash == dest_hash:
-                            # Files are identical (duplicate)
-                            file_size = source_size
-                            if DELETE_DUPLICATES:
-                                os.remove(file_path)
-                                # Format destination path for log
-                                dest_format = os.path.relpath(dest_path, DEST_DIR).replace(os.sep, '/')
-                                log_file_event("Duplicate Deleted", file_path, None, file_size, f"Exact duplicate to {dest_format} detected and deleted")
-                                stats["files_deleted"] += 1
-                                stats["bytes_deleted"] += file_size
-                                bytes_deleted += file_size  # Legacy compatibility
-                                save_statistics_if_needed()
-                                update_synology_indexer(old_path=file_path, new_path=None)
-                            else:
-                                # Keep duplicate with unique name
-                                duplicates_folder = os.path.join(unknown_folder, 'Duplicates')
-                                ensure_dir(duplicates_folder)
-                                unique_name = get_unique_duplicate_filename(duplicates_folder, original_filename)
-                                duplicates_path = os.path.join(duplicates_folder, unique_name)
-                                shutil.move(file_path, duplicates_path)
-                                # Format destination path for log
-                                dest_format = os.path.relpath(dest_path, DEST_DIR).replace(os.sep, '/')
-                                log_file_event("Moved to Duplicates", file_path, duplicates_path, file_size, f"Unknown file type - exact duplicate to {dest_format} detected (kept, not deleted)")
-                                stats["files_moved_to_duplicates"] += 1
-                                stats["bytes_moved_to_duplicates"] += file_size
-                                bytes_moved += file_size  # Legacy compatibility
-                                save_statistics_if_needed()
-                                update_synology_indexer(old_path=file_path, new_path=duplicates_path)
-                            return
+                if files_have_same_content(source_info, dest_info):
+                    # Files are identical (duplicate)
+                    file_size = source_info.size
+                    if DELETE_DUPLICATES:
+                        os.remove(file_path)
+                        # Format destination path for log
+                        dest_format = os.path.relpath(dest_path, DEST_DIR).replace(os.sep, '/')
+                        log_file_event("Duplicate Deleted", file_path, None, file_size, f"Exact duplicate to {dest_format} detected and deleted")
+                        record_file_operation("deleted", file_size)
+                        save_statistics_if_needed()
+                        update_synology_indexer(old_path=file_path, new_path=None)
+                    else:
+                        # Keep duplicate with unique name
+                        duplicates_folder = os.path.join(unknown_folder, 'Duplicates')
+                        ensure_dir(duplicates_folder)
+                        unique_name = get_unique_duplicate_filename(duplicates_folder, original_filename)
+                        duplicates_path = os.path.join(duplicates_folder, unique_name)
+                        move_into_dir(file_path, duplicates_path)
+                        index_added_file(duplicates_folder, duplicates_path)
+                        # Format destination path for log
+                        dest_format = os.path.relpath(dest_path, DEST_DIR).replace(os.sep, '/')
+                        log_file_event("Moved to Duplicates", file_path, duplicates_path, file_size, f"Unknown file type - exact duplicate to {dest_format} detected (kept, not deleted)")
+                        record_file_operation("moved_to_duplicates", file_size)
+                        save_statistics_if_needed()
+                        update_synology_indexer(old_path=file_path, new_path=duplicates_path)
+                    return True
             except Exception:
                 pass
         
         # Move file to Unknown File Types folder
         try:
-            file_size = os.path.getsize(file_path)
-            shutil.move(file_path, dest_path)
+            file_size = file_stat.st_size
+            move_into_dir(file_path, dest_path)
             # Update statistics IMMEDIATELY after move to ensure it's counted even if logging fails
-            stats["files_moved_to_destination"] += 1
-            stats["bytes_moved_to_destination"] += file_size
-            bytes_moved += file_size  # Legacy compatibility
+            record_file_operation("moved_to_destination", file_size)
             save_statistics_if_needed()
             
             # Format destination path for log
@@ -1132,61 +2285,16 @@ def process_photo(file_path):
                 pass
         except Exception as e:
             log_file_event("Error", file_path, dest_path, None, f"Error moving unknown file type: {e}")
-        return
-    
-    # Try to get date from metadata
-    media_datetime = None
-    if is_video:
-        # For video files, try to get date from video metadata
-        media_datetime = get_video_taken_date(file_path)
-    else:
-        # For image files, try to get date from EXIF
-        media_datetime = get_exif_taken_date(file_path)
-    
-    # If no metadata date found, try file metadata (works for both images and videos)
-    if not media_datetime:
-        media_datetime = get_file_date(file_path)
-    
-    if media_datetime:
-        # We have a date, rename file to yyyymmdd_hhmmss.* (without subseconds for destination folder)
-        new_filename = format_datetime_for_filename(media_datetime, include_subseconds=False) + file_ext
-        year = media_datetime.strftime('%Y')
-        # Format month as mm_MMM (e.g., 08_Aug)
-        month_num = media_datetime.strftime('%m')
-        month_abbr = media_datetime.strftime('%b')
-        month_folder = f"{month_num}_{month_abbr}"
-        dest_folder = os.path.join(DEST_DIR, year, month_folder)
-        dest_filename = new_filename
-    else:
-        # No date found, keep original filename and move to NoDateFound
-        dest_folder = os.path.join(DEST_DIR, 'NoDateFound')
-        dest_filename = original_filename
-    
-    ensure_dir(dest_folder)
-    dest_path = os.path.join(dest_folder, dest_filename)
+        return True
     
-    # Check if destination file already exists
-    if os.path.exists(dest_path):
-        # Compare MD5 hashes to determine if it's a duplicate
-        print(f"File {dest_filename} already exists at {dest_path}, comparing MD5 hashes...")
-        # Get file sizes first - if different, they're not duplicates (optimization)
-        try:
-            source_size = os.path.getsize(file_path)
-            dest_size = os.path.getsize(dest_path)
-        except Exception:
-            source_size = dest_size = 0
+    if dest_stat is not None:
+        # Compare content hashes to determine if it's a duplicate
+        print(f"File {dest_filename} already exists at {dest_path}, comparing file hashes...")
         
-        # Only check MD5 if sizes match (optimization)
-        source_hash = None
-        dest_hash = None
-        if source_size == dest_size:
-            source_hash = calculate_md5(file_path)
-            if source_hash is not None:
-                dest_hash = calculate_md5(dest_path)
-        
-        if source_hash == dest_hash and source_hash is not None:
+        # Only compare contents if sizes match (checked first by files_have_same_content)
+        if files_have_same_content(source_info, dest_info):
             # Files are identical (duplicate)
-            file_size = source_size
+            file_size = source_info.size
             try:
                 if DELETE_DUPLICATES:
                     # Delete the duplicate file
@@ -1195,68 +2303,47 @@ def process_photo(file_path):
                     dest_format = os.path.relpath(dest_path, DEST_DIR).replace(os.sep, '/')
                     log_file_event("Duplicate Deleted", file_path, None, file_size, f"Exact duplicate to {dest_format} detected and deleted")
                     # Update statistics
-                    stats["files_deleted"] += 1
-                    stats["bytes_deleted"] += file_size
-                    bytes_deleted += file_size  # Legacy compatibility
+                    record_file_operation("deleted", file_size)
                     save_statistics_if_needed()
                     # Update Synology indexer (remove deleted file from index)
                     update_synology_indexer(old_path=file_path, new_path=None)
                 else:
                     # Keep duplicates: move to Duplicates folder instead of deleting
-                    duplicates_folder = os.path.join(DEST_DIR, 'Duplicates')
+                    duplicates_folder = get_duplicates_folder(source_info)
                     ensure_dir(duplicates_folder)
                     # Use the destination filename (without subseconds) as base for duplicates
                     unique_name = get_unique_duplicate_filename(duplicates_folder, dest_filename, media_datetime)
                     duplicates_path = os.path.join(duplicates_folder, unique_name)
 
-                    shutil.move(file_path, duplicates_path)
+                    move_into_dir(file_path, duplicates_path)
+                    index_added_file(duplicates_folder, duplicates_path)
                     # Format destination path for log
                     dest_format = os.path.relpath(dest_path, DEST_DIR).replace(os.sep, '/')
                     log_file_event("Moved to Duplicates", file_path, duplicates_path, file_size, f"Exact duplicate to {dest_format} detected (kept, not deleted)")
                     # Update statistics
-                    stats["files_moved_to_duplicates"] += 1
-                    stats["bytes_moved_to_duplicates"] += file_size
-                    bytes_moved += file_size  # Legacy compatibility
+                    record_file_operation("moved_to_duplicates", file_size)
                     save_statistics_if_needed()
                     # Update Synology indexer to reflect new location
                     update_synology_indexer(old_path=file_path, new_path=duplicates_path)
 
             except Exception as e:
                 log_file_event("Error", file_path, None, None, f"Error handling duplicate: {e}")
-            return
+            return True
         else:
-            # Files have different content (MD5 mismatch), check which file was modified
-            source_mod_time = get_file_modification_time(file_path)
-            dest_mod_time = get_file_modification_time(dest_path)
-            
-            if source_mod_time and dest_mod_time:
-                # Determine which file is newer (modified)
-                if source_mod_time > dest_mod_time:
-                    # Source file is newer, move it to Duplicates
-                    file_to_move = file_path
-                    file_name = dest_filename
-                    event_info = f"Newer file (modified: {source_mod_time.strftime('%Y-%m-%d %H:%M:%S')})"
-                else:
-                    # Destination file is newer, move it to Duplicates and keep source
-                    file_to_move = dest_path
-                    file_name = dest_filename
-                    event_info = f"Older file (modified: {dest_mod_time.strftime('%Y-%m-%d %H:%M:%S')})"
-            else:
-                # Fallback if we can't get modification times
-                file_to_move = file_path
-                file_name = dest_filename
-                event_info = "Unable to get modification times"
+            # Files have different content (hash mismatch), check which file was modified
+            file_to_move_info, event_info = _choose_file_to_replace(source_info, dest_info)
+            file_to_move = file_to_move_info.path
             
             # Move the modified file to Duplicates folder
-            duplicates_folder = os.path.join(DEST_DIR, 'Duplicates')
+            duplicates_folder = get_duplicates_folder(file_to_move_info)
             ensure_dir(duplicates_folder)
             
-            # Check if a file with the same MD5 hash already exists in Duplicates folder
-            existing_duplicate = check_duplicate_md5_in_folder(file_to_move, duplicates_folder)
+            # Check if a file with the same content hash already exists in Duplicates folder
+            existing_duplicate = check_duplicate(file_to_move_info, duplicates_folder)
             if existing_duplicate:
                 # A duplicate already exists in Duplicates folder, delete the current file instead
                 try:
-                    file_size = os.path.getsize(file_to_move)
+                    file_size = file_to_move_info.size
                     os.remove(file_to_move)
                     # Format destination path for log
                     if file_to_move == dest_path:
@@ -1269,13 +2356,9 @@ def process_photo(file_path):
                     # Update statistics
                     # If deleting from destination, subtract from destination stats
                     if file_to_move == dest_path:
-                        stats["files_moved_to_destination"] = max(0, stats["files_moved_to_destination"] - 1)
-                        stats["bytes_moved_to_destination"] = max(0, stats["bytes_moved_to_destination"] - file_size)
-                        bytes_moved = max(0, bytes_moved - file_size)  # Legacy compatibility
+                        record_file_operation("moved_to_destination", file_size, count=-1)
                     # Add to deleted stats
-                    stats["files_deleted"] += 1
-                    stats["bytes_deleted"] += file_size
-                    bytes_deleted += file_size  # Legacy compatibility
+                    record_file_operation("deleted", file_size)
                     save_statistics_if_needed()
                     # Update Synology indexer (remove deleted file from index)
                     update_synology_indexer(old_path=file_to_move, new_path=None)
@@ -1285,12 +2368,10 @@ def process_photo(file_path):
                 # If we were going to move the destination file, now move the source to its place
                 if file_to_move == dest_path:
                     try:
-                        file_size = os.path.getsize(file_path)
-                        shutil.move(file_path, dest_path)
+                        file_size = file_stat.st_size
+                        move_into_dir(file_path, dest_path)
                         # Update statistics IMMEDIATELY after move to ensure it's counted even if logging fails
-                        stats["files_moved_to_destination"] += 1
-                        stats["bytes_moved_to_destination"] += file_size
-                        bytes_moved += file_size  # Legacy compatibility
+                        record_file_operation("moved_to_destination", file_size)
                         save_statistics_if_needed()
                         
                         # Format destination path for log
@@ -1311,15 +2392,16 @@ def process_photo(file_path):
                             pass
                     except Exception as e:
                         log_file_event("Error", file_path, dest_path, None, f"Error moving source to destination: {e}")
-                return
+                return True
             
             # No duplicate found in Duplicates folder, proceed with moving
-            unique_filename = get_unique_duplicate_filename(duplicates_folder, file_name, media_datetime)
+            unique_filename = get_unique_duplicate_filename(duplicates_folder, dest_filename, media_datetime)
             duplicates_path = os.path.join(duplicates_folder, unique_filename)
             
             try:
-                file_size = os.path.getsize(file_to_move)
-                shutil.move(file_to_move, duplicates_path)
+                file_size = file_to_move_info.size
+                move_into_dir(file_to_move, duplicates_path)
+                index_added_file(duplicates_folder, duplicates_path)
                 # Format destination path for log
                 dest_format = os.path.relpath(dest_path, DEST_DIR).replace(os.sep, '/')
                 log_file_event("Moved to Duplicates", file_to_move, duplicates_path, file_size, f"Different content than file {dest_format} - {event_info}")
@@ -1327,12 +2409,9 @@ def process_photo(file_path):
                 # If moving from destination to duplicates, adjust destination stats
                 if file_to_move == dest_path:
                     # File was previously in destination, subtract from destination stats
-                    stats["files_moved_to_destination"] = max(0, stats["files_moved_to_destination"] - 1)
-                    stats["bytes_moved_to_destination"] = max(0, stats["bytes_moved_to_destination"] - file_size)
-                    bytes_moved = max(0, bytes_moved - file_size)  # Legacy compatibility
+                    record_file_operation("moved_to_destination", file_size, count=-1)
                 # Add to duplicates stats
-                stats["files_moved_to_duplicates"] += 1
-                stats["bytes_moved_to_duplicates"] += file_size
+                record_file_operation("moved_to_duplicates", file_size)
                 save_statistics_if_needed()
                 # Update Synology indexer
                 update_synology_indexer(old_path=file_to_move, new_path=duplicates_path)
@@ -1340,12 +2419,10 @@ def process_photo(file_path):
                 # If we moved the destination file, now move the source to its place
                 if file_to_move == dest_path:
                     try:
-                        file_size = os.path.getsize(file_path)
-                        shutil.move(file_path, dest_path)
+                        file_size = file_stat.st_size
+                        move_into_dir(file_path, dest_path)
                         # Update statistics IMMEDIATELY after move to ensure it's counted even if logging fails
-                        stats["files_moved_to_destination"] += 1
-                        stats["bytes_moved_to_destination"] += file_size
-                        bytes_moved += file_size  # Legacy compatibility
+                        record_file_operation("moved_to_destination", file_size)
                         save_statistics_if_needed()
                         
                         # Format destination path for log
@@ -1368,19 +2445,14 @@ def process_photo(file_path):
                         log_file_event("Error", file_path, dest_path, None, f"Error moving source to destination: {e}")
             except Exception as e:
                 log_file_event("Error", file_to_move, duplicates_path, None, f"Error moving to Duplicates: {e}")
-            return
+            return True
     
     try:
-        # Final check before moving - file might have been moved by another process
-        if not os.path.isfile(file_path):
-            return
-        
-        file_size = os.path.getsize(file_path)
-        shutil.move(file_path, dest_path)
+        # A file already moved by another worker makes the move fail with FileNotFoundError
+        file_size = file_stat.st_size
+        move_into_dir(file_path, dest_path)
         # Update statistics IMMEDIATELY after move to ensure it's counted even if logging fails
-        stats["files_moved_to_destination"] += 1
-        stats["bytes_moved_to_destination"] += file_size
-        bytes_moved += file_size  # Legacy compatibility
+        record_file_operation("moved_to_destination", file_size)
         save_statistics_if_needed()
         
         # Format destination path for log
@@ -1403,12 +2475,15 @@ def process_photo(file_path):
         except Exception:
             pass  # Indexer update failed, but file was moved and stats were updated
     except FileNotFoundError:
-        # File was already moved or deleted, ignore silently
-        pass
+        # File was already moved or deleted, or the destination folder was removed
+        # externally - forget the folder so the next attempt recreates it
+        _known_dirs.discard(dest_folder)
     except Exception as e:
+        _known_dirs.discard(dest_folder)
         # Only log error if file still exists (might be a real error)
         if os.path.exists(file_path):
             log_file_event("Error", file_path, dest_path, None, f"Error moving file: {e}")
+    return True
 
 def move_photos_by_date():
     """Process all existing photos in the source directory."""
@@ -1417,23 +2492,63 @@ def move_photos_by_date():
         ensure_dir(SOURCE_DIR)
         return
     
-    files_found = []
-    for filename in os.listdir(SOURCE_DIR):
-        # Skip Windows Zone.Identifier files
-        if filename.endswith('.Zone.Identifier'):
-            continue
-        file_path = os.path.join(SOURCE_DIR, filename)
-        if os.path.isfile(file_path):
-            files_found.append(file_path)
+    # scandir() returns the file type with the directory listing, so the scan itself
+    # needs no stat() calls; each file is stat'ed once by probe_file() in process_photo(),
+    # in the same open that reads the EXIF header of JPEG files
+    def scan_files():
+        with os.scandir(SOURCE_DIR) as entries:
+            for entry in entries:
+                # Skip Windows Zone.Identifier files
+                if entry.name.endswith('.Zone.Identifier'):
+                    continue
+                try:
+                    if entry.is_file():
+                        yield entry.path
+                except OSError:
+                    pass  # File was removed while scanning
     
-    for file_path in files_found:
-        try:
-            process_photo(file_path)
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
+    # Files are processed while the folder is still being listed
+    process_files(scan_files())
+
+def process_photo_safely(file_path, file_closed=False):
+    """process_photo() for worker threads - errors are printed instead of raised."""
+    try:
+        process_photo(file_path, file_closed)
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+
+def process_files(files):
+    """Process a batch of files in parallel and wait for all of them to finish.
+    
+    Metadata reads, hashing and the wait for files to settle run concurrently in the worker
+    pool; the moves themselves are serialized by _file_operation_lock. At most
+    SCAN_MAX_PENDING files are queued in the pool at a time.
+    
+    Args:
+        files: Iterable of file paths (may be a generator)
+    """
+    pending = collections.deque()
+    for file_path in files:
+        if _stop_requested.is_set():
+            break
+        if len(pending) >= SCAN_MAX_PENDING:
+            pending.popleft().result()
+        pending.append(_io_pool.submit(process_photo_safely, file_path))
+    for future in pending:
+        # After a stop signal, files not yet started are dropped
+        if not (_stop_requested.is_set() and future.cancel()):
+            future.result()
 
 class PhotoHandler(FileSystemEventHandler):
-    """Handler for file system events in the watched directory."""
+    """Handler for file system events in the watched directory.
+    
+    With close_events enabled (observers that report inotify IN_CLOSE_WRITE), files
+    that are still being written are processed from on_closed() instead of on_created().
+    """
+    
+    def __init__(self, close_events=False):
+        super().__init__()
+        self.close_events = close_events
     
     def on_created(self, event):
         """Called when a file or directory is created."""
@@ -1443,11 +2558,24 @@ class PhotoHandler(FileSystemEventHandler):
                 return
 
             try:
-                file_size = os.path.getsize(event.src_path)
-                log_file_event("File Detected", event.src_path, None, file_size, "File detected")
+                file_stat = os.stat(event.src_path)
+                log_file_event("File Detected", event.src_path, None, file_stat.st_size, "File detected")
             except Exception:
+                file_stat = None
                 log_file_event("File Detected", event.src_path, None, None, "New file detected")
-            process_photo(event.src_path)
+            
+            # A recently modified file is still being written: on_closed() picks it up.
+            # Older files (e.g. moved in from elsewhere) produce no close event.
+            if self.close_events and file_stat is not None and time.time() - file_stat.st_mtime <= FILE_SETTLE_AGE:
+                return
+            _io_pool.submit(process_photo_safely, event.src_path)
+    
+    def on_closed(self, event):
+        """Called when a file opened for writing is closed (inotify IN_CLOSE_WRITE)."""
+        if self.close_events and not event.is_directory:
+            if event.src_path.endswith('.Zone.Identifier'):
+                return
+            _io_pool.submit(process_photo_safely, event.src_path, True)
     
     def on_moved(self, event):
         """Called when a file or directory is moved/renamed."""
@@ -1455,45 +2583,217 @@ class PhotoHandler(FileSystemEventHandler):
             # Only process moves if the destination is in the source directory
             # This prevents processing files that were moved OUT of the source directory
             try:
-                abs_dest_path = os.path.abspath(event.dest_path)
-                abs_source_dir = os.path.abspath(SOURCE_DIR)
-                
                 # Only process if destination is within source directory
-                if abs_dest_path.startswith(abs_source_dir + os.sep) or abs_dest_path == abs_source_dir:
+                if is_in_source_dir(event.dest_path):
                     try:
                         file_size = os.path.getsize(event.dest_path)
                         log_file_event("File Moved/Renamed", event.src_path, event.dest_path, file_size, "External move detected")
                     except Exception:
                         log_file_event("File Moved/Renamed", event.src_path, event.dest_path, None, "External move detected")
-                    process_photo(event.dest_path)
+                    _io_pool.submit(process_photo_safely, event.dest_path)
             except Exception:
                 # If path check fails, skip to avoid errors
                 pass
 
-def start_watching():
-    """Start watching the source directory for new files."""
+class InotifyObserver:
+    """Minimal watchdog-compatible observer built directly on Linux inotify.
+    
+    Only IN_CLOSE_WRITE and IN_MOVED_TO are watched, so events fire once a file has
+    been fully written or moved into the folder. Each event is dispatched to the
+    handler as a FileCreatedEvent. Subdirectories are not watched.
+    """
+    
+    def __init__(self):
+        self._watches = []
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def schedule(self, event_handler, path, recursive=False):
+        """Register an event handler for a directory (recursive watching is not supported)."""
+        self._watches.append((event_handler, path))
+    
+    def start(self):
+        """Start the inotify reader thread."""
+        self._thread = threading.Thread(target=self._run, name="InotifyObserver", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Signal the reader thread to stop."""
+        self._stop_event.set()
+    
+    def join(self, timeout=None):
+        """Wait for the reader thread to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def _run(self):
+        mask = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+        with INotify() as inotify:
+            # Watch descriptor -> (handler, folder path with trailing separator)
+            handlers = {}
+            for event_handler, path in self._watches:
+                handlers[inotify.add_watch(path, mask)] = (event_handler, os.path.join(path, ''))
+            
+            while not self._stop_event.is_set():
+                # Wake up every second to check for stop requests
+                for event in inotify.read(timeout=1000):
+                    if event.mask & inotify_flags.ISDIR or not event.name:
+                        continue
+                    if event.name.endswith('.Zone.Identifier'):
+                        continue
+                    watch = handlers.get(event.wd)
+                    if watch is None:
+                        continue
+                    event_handler, path_prefix = watch
+                    try:
+                        event_handler.dispatch(FileCreatedEvent(path_prefix + event.name))
+                    except Exception as e:
+                        print(f"Error handling inotify event for {event.name}: {e}")
+
+# Milliseconds watchfiles waits for more changes before reporting a batch, and the
+# interval at which it checks for new changes within a batch
+WATCHFILES_DEBOUNCE_MS = 1600
+WATCHFILES_STEP_MS = 50
+
+class WatchfilesObserver:
+    """Minimal watchdog-compatible observer built on watchfiles (Rust notify backend).
+    
+    Event collection and debouncing run in native code; each batch of changes is
+    dispatched to the handler as one FileCreatedEvent per added file. Later
+    modifications are not dispatched, so a file copied in over several batches is
+    only submitted once (process_photo() waits for it to be complete).
+    """
+    
+    def __init__(self):
+        self._watches = []
+        self._stop_event = threading.Event()
+        self._threads = []
+    
+    def schedule(self, event_handler, path, recursive=False):
+        """Register an event handler for a directory."""
+        self._watches.append((event_handler, path, recursive))
+    
+    def start(self):
+        """Start one watcher thread per scheduled directory."""
+        self._threads = [threading.Thread(target=self._run, args=watch, name="WatchfilesObserver", daemon=True)
+                         for watch in self._watches]
+        for thread in self._threads:
+            thread.start()
+    
+    def stop(self):
+        """Signal the watcher threads to stop (they notice within WATCHFILES_STEP_MS)."""
+        self._stop_event.set()
+    
+    def join(self, timeout=None):
+        """Wait for the watcher threads to finish."""
+        for thread in self._threads:
+            thread.join(timeout)
+    
+    def _run(self, event_handler, path, recursive):
+        import watchfiles
+        for changes in watchfiles.watch(path, recursive=recursive, debounce=WATCHFILES_DEBOUNCE_MS,
+                                        step=WATCHFILES_STEP_MS, stop_event=self._stop_event,
+                                        raise_interrupt=False):
+            # A file copied in shows up as added and modified in the same batch
+            changed_paths = {changed_path for change, changed_path in changes
+                             if change == watchfiles.Change.added}
+            for changed_path in sorted(changed_paths):
+                if changed_path.endswith('.Zone.Identifier'):
+                    continue
+                try:
+                    if os.path.isdir(changed_path):
+                        continue
+                    event_handler.dispatch(FileCreatedEvent(changed_path))
+                except Exception as e:
+                    print(f"Error handling watchfiles event for {changed_path}: {e}")
+
+# File system types on which inotify does not see changes made by other hosts
+# (FUSE file systems, reported as 'fuse.<name>', are treated the same way)
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3'}
+
+def is_network_filesystem(path):
+    """Check if a path is on a network share (NFS/CIFS/SMB) or FUSE mount where events may be missed."""
+    abs_path = os.path.abspath(path)
+    # Windows UNC paths (\\server\share)
+    if abs_path.startswith('\\\\'):
+        return True
+    try:
+        with open('/proc/mounts', 'r') as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except Exception:
+        return False
+    
+    # Use the longest mount point containing the path
+    fs_type = None
+    best_match = -1
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        if abs_path == mount_point or abs_path.startswith(mount_point.rstrip('/') + '/'):
+            if len(mount_point) > best_match:
+                best_match = len(mount_point)
+                fs_type = mount_type
+    return fs_type is not None and (fs_type in NETWORK_FILESYSTEMS or fs_type.startswith('fuse.'))
+
+def create_observer():
+    """Create the file system observer best suited for SOURCE_DIR.
+    
+    Network shares use a PollingObserver that scans every POLL_INTERVAL seconds
+    ([watcher] poll_interval in config.ini). Otherwise native inotify is used on
+    Synology NAS when inotify_simple is installed, and the watchdog Observer on Linux
+    when close events are enabled ([watcher] close_events), since both report files
+    once they are fully written. watchfiles, when installed, is used on all other
+    systems, and the watchdog Observer without it.
+    """
+    from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
+    if is_network_filesystem(SOURCE_DIR):
+        print(f"Network file system detected - polling for changes every {POLL_INTERVAL:g} seconds")
+        return PollingObserver(timeout=POLL_INTERVAL)
+    if is_synology_nas() and INOTIFY_AVAILABLE:
+        print("Using native inotify folder watcher")
+        return InotifyObserver()
+    if USE_CLOSE_EVENTS and sys.platform.startswith('linux'):
+        return Observer()
+    if WATCHFILES_AVAILABLE:
+        print("Using watchfiles folder watcher")
+        return WatchfilesObserver()
+    return Observer()
+
+def observer_reports_close_events(observer):
+    """Check whether an observer emits on_closed events (watchdog's inotify backend on Linux)."""
+    from watchdog.observers import Observer
+    return sys.platform.startswith('linux') and type(observer) is Observer
+
+def start_watching(observer=None):
+    """Start watching the source directory for new files.
+    
+    Args:
+        observer: Observer to use (see create_observer()), created here if None
+    """
     global last_file_detected_time, last_statistics_log_time, statistics_reset_time
     
     if not os.path.exists(SOURCE_DIR):
         print(f"Source directory {SOURCE_DIR} does not exist. Creating it...")
         ensure_dir(SOURCE_DIR)
     
-    print(f"Starting folder watcher for: {os.path.abspath(SOURCE_DIR)}")
+    print(f"Starting folder watcher for: {get_abs_source_dir()}")
     print("Press Ctrl+C to stop watching...")
     
     # Initialize last file detected time to now (so we don't log immediately)
-    last_file_detected_time = time.time()
+    start_coarse_clock()
+    last_file_detected_time = coarse_now
     last_statistics_log_time = time.time()
     statistics_reset_time = None
     
-    event_handler = PhotoHandler()
-    observer = Observer()
+    if observer is None:
+        observer = create_observer()
+    event_handler = PhotoHandler(close_events=USE_CLOSE_EVENTS and observer_reports_close_events(observer))
     observer.schedule(event_handler, SOURCE_DIR, recursive=False)
     observer.start()
     
     try:
         check_interval = 0
-        while True:
+        while not _stop_requested.is_set():
             time.sleep(1)
             check_interval += 1
             
@@ -1502,34 +2802,37 @@ def start_watching():
                 check_interval = 0
                 try:
                     if os.path.exists(SOURCE_DIR):
-                        files = [f for f in os.listdir(SOURCE_DIR) 
-                                if os.path.isfile(os.path.join(SOURCE_DIR, f)) 
-                                and not f.endswith('.Zone.Identifier')]
-                        if files:
-                            for filename in files:
-                                file_path = os.path.join(SOURCE_DIR, filename)
-                                # Verify file still exists and is in source directory before processing
-                                if os.path.isfile(file_path):
+                        settled_files = []
+                        now = time.time()
+                        with os.scandir(SOURCE_DIR) as entries:
+                            for entry in entries:
+                                if entry.name.endswith('.Zone.Identifier'):
+                                    continue
+                                # Files still being written at a recent rescan are not stat'ed again yet
+                                if not pending_file_due(entry.path, now):
+                                    continue
+                                try:
+                                    if not entry.is_file():
+                                        continue
                                     # Only process if file is older than 2 seconds (fully written)
-                                    if time.time() - os.path.getmtime(file_path) > 2:
-                                        try:
-                                            process_photo(file_path)
-                                        except FileNotFoundError:
-                                            # File was moved/deleted during processing, ignore
-                                            pass
-                                        except Exception:
-                                            # Other errors, log but don't crash
-                                            pass
+                                    file_stat = entry.stat()
+                                    if now - file_stat.st_mtime > FILE_SETTLE_AGE:
+                                        settled_files.append(entry.path)
+                                    else:
+                                        mark_file_pending(entry.path, now)
+                                except OSError:
+                                    # File was moved/deleted in the meantime, ignore
+                                    pass
+                        if settled_files:
+                            process_files(settled_files)
                 except Exception:
                     pass
             
-            # Check if 1 minute (60 seconds) has passed since last file detection
-            current_time = time.time()
-            if last_file_detected_time is not None:
-                time_since_last_file = current_time - last_file_detected_time
-                
+            # Check if IDLE_RESET_TIMEOUT (1 minute) has passed since last file detection
+            current_time = coarse_now
+            if last_file_detected_time is not None and statistics_reset_time is None:
                 # If 1 minute has passed with no file activity, log statistics and reset
-                if time_since_last_file >= 60 and statistics_reset_time is None:
+                if current_time - last_file_detected_time >= IDLE_RESET_TIMEOUT:
                     global bytes_moved, bytes_deleted
                     # Log statistics before resetting (if there are any to log)
                     # Check if there are any statistics to log
@@ -1548,32 +2851,41 @@ def start_watching():
                     last_file_detected_time = current_time
     except KeyboardInterrupt:
         print("\nStopping folder watcher...")
+    finally:
+        # Also runs for the SystemExit raised by the signal handler, so observer threads
+        # (some running native code) end before the interpreter shuts down
         observer.stop()
-    
-    observer.join()
+        observer.join()
     print("Folder watcher stopped.")
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Organize photos and videos by date and remove duplicates.")
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help=f"number of worker threads for file processing (default: {IO_WORKERS})")
+    args = parser.parse_args()
+    
     # Register cleanup function to log statistics on exit (only if not already logged)
     def exit_handler():
-        global statistics_already_logged
-        if not statistics_already_logged:
-            # Force save statistics before logging
-            save_statistics(force=True)
+        if not _stats_logged.is_set():
+            # Write queued log lines first; log_statistics() saves the statistics
+            flush_logs()
             log_statistics()
     atexit.register(exit_handler)
     
-    # Register signal handlers for graceful shutdown
+    # Register signal handlers for graceful shutdown. The handler only requests the stop:
+    # the interrupted main thread may hold the statistics or log locks, so the saving is
+    # done by the main thread once the watch loop or scan has ended
     def signal_handler(signum, frame):
+        if _stop_requested.is_set():
+            return
         print("\nReceived interrupt signal, logging statistics...")
-        try:
-            # Force save statistics before logging
-            save_statistics(force=True)
-            log_statistics()
-            log_system_event("Info", "Photo Organizer service stopped by signal")
-        except Exception as e:
-            print(f"Error logging statistics: {e}")
-        sys.exit(0)
+        # Bound the shutdown: if saving or logging hangs (e.g. on a stuck network mount),
+        # exit anyway after SHUTDOWN_TIMEOUT seconds
+        shutdown_watchdog = threading.Timer(SHUTDOWN_TIMEOUT, os._exit, args=(0,))
+        shutdown_watchdog.daemon = True
+        shutdown_watchdog.start()
+        _stop_requested.set()
     
     # Only register signal handlers on Unix-like systems (Windows handles CTRL-C differently)
     if hasattr(signal, 'SIGINT'):
@@ -1593,6 +2905,12 @@ if __name__ == "__main__":
     # Load runtime configuration (paths, duplicate policy)
     load_runtime_config()
     
+    # Worker count: --jobs overrides [processing] jobs from config.ini
+    if args.jobs is not None:
+        CONFIGURED_JOBS = args.jobs
+    if CONFIGURED_JOBS is not None:
+        set_io_workers(CONFIGURED_JOBS)
+    
     # Detect if running on Synology NAS and log it
     if is_synology_nas():
         log_system_event("Info", "Photo Organizer service starting (Synology NAS detected)")
@@ -1612,34 +2930,43 @@ if __name__ == "__main__":
     initialize_log_file()
     print(f"Log file: {LOG_FILE}")
     print(f"System log: {SYSTEM_LOG_FILE}")
-    print(f"Source directory: {os.path.abspath(SOURCE_DIR) if not os.path.isabs(SOURCE_DIR) else SOURCE_DIR}")
-    print(f"Destination directory: {os.path.abspath(DEST_DIR) if not os.path.isabs(DEST_DIR) else DEST_DIR}")
+    # Paths were made absolute by load_runtime_config()
+    print(f"Source directory: {SOURCE_DIR}")
+    print(f"Destination directory: {DEST_DIR}")
     print("=" * 80)
     print()
     
     log_system_event("Info", "Photo Organizer service started successfully and watching for new files")
     
+    # Move files in the Duplicates folder into shard folders if sharding was enabled
+    migrate_duplicates_to_shards()
+    
     # Process any existing photos first
     print("Processing existing photos...")
     move_photos_by_date()
     print("Existing photos processed.\n")
     
     # Start watching for new files
-    statistics_logged = False
     try:
-        start_watching()
+        # The observer type depends on the file system SOURCE_DIR is on
+        if not _stop_requested.is_set():
+            start_watching(create_observer())
+        if _stop_requested.is_set():
+            # Write queued log lines first, then save statistics once: log_statistics()
+            # saves them unless already done, flush_statistics() saves any later changes
+            flush_logs()
+            log_statistics()
+            flush_statistics()
+            log_system_event("Info", "Photo Organizer service stopped by signal")
     except KeyboardInterrupt:
         print("\nReceived interrupt signal, logging statistics...")
         log_statistics()
-        statistics_logged = True
         log_system_event("Info", "Photo Organizer service stopped by user")
     except Exception as e:
         log_statistics()
-        statistics_logged = True
         log_system_event("Error", f"Photo Organizer service stopped due to error: {str(e)}")
         raise
     finally:
-        # Log statistics before stopping (in case it wasn't logged above)
-        if not statistics_logged:
-            log_statistics()
+        # Log statistics before stopping (does nothing if already logged above)
+        log_statistics()
         log_system_event("Info", "Photo Organizer service stopped")